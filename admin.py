@@ -0,0 +1,328 @@
+from datetime import datetime
+
+import click
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy.orm import joinedload
+
+from auth import admin_required
+from config import navigation_items
+from exports import (
+    EXPORT_FORMATS,
+    MIMETYPES,
+    gzip_chunks,
+    serialize_rows,
+    stream_rows,
+)
+from extensions import db, metrics, photo_collector, principal_cache
+from forms import EditPostForm, EditUserForm
+from models import People, Posts, Users
+from pagination import encode_cursor, keyset_page
+from photos import referenced_photos, release_photo
+from search import ranked_matches
+from streaming import stream_page
+
+bp = Blueprint("admin", __name__, cli_group=None)
+
+
+def users_matching(search_query):
+    return (
+        (Users.name.like(f"%{search_query}%"))
+        | (Users.surname.like(f"%{search_query}%"))
+        | (Users.username.like(f"%{search_query}%"))
+    )
+
+
+@bp.route("/admin", methods=["GET", "POST"], endpoint="index")
+@admin_required
+def admin():
+    search_query = request.args.get("search")
+    users_query = Users.query
+    posts_query = Posts.query.options(joinedload(Posts.author))
+    post_keys = [(Posts.date, True), (Posts.id, True)]
+    if search_query:
+        users_query = users_query.filter(users_matching(search_query))
+        matches = ranked_matches(search_query)
+        if matches is not None:
+            posts_query = posts_query.join(matches, matches.c.post_id == Posts.id)
+            post_keys = [(matches.c.rank, False), (Posts.id, False)]
+
+    page_size = current_app.config["PAGE_SIZE"]
+    users_page = keyset_page(
+        users_query,
+        [(Users.id, False)],
+        page_size,
+        after=request.args.get("users_after"),
+        before=request.args.get("users_before"),
+    )
+    posts_page = keyset_page(
+        posts_query,
+        post_keys,
+        page_size,
+        after=request.args.get("posts_after"),
+        before=request.args.get("posts_before"),
+    )
+    return stream_page(
+        "admin.html",
+        users=users_page.items,
+        posts=posts_page.items,
+        users_page=users_page,
+        posts_page=posts_page,
+        navigation_items=navigation_items,
+    )
+
+
+@bp.route("/admin/metrics", endpoint="metrics")
+@admin_required
+def admin_metrics():
+    return current_app.response_class(
+        metrics.render(), mimetype="text/plain; version=0.0.4"
+    )
+
+
+@bp.route("/admin/slow_requests")
+@admin_required
+def slow_requests():
+    return render_template(
+        "slow_requests.html",
+        requests=list(reversed(metrics.slow_requests)),
+        threshold=metrics.slow_threshold,
+        navigation_items=navigation_items,
+    )
+
+
+EXPORT_TABLES = ("posts", "users")
+
+
+def export_statement(table, search_query=None):
+    """SELECT for an export, filtered like the admin panel's search.
+
+    Rows come out in primary key order so the export streams straight off
+    the table without a sort. Password hashes are never exported.
+    """
+    if table == "users":
+        statement = db.select(
+            Users.id, Users.name, Users.surname, Users.username, Users.is_admin
+        ).order_by(Users.id)
+        if search_query:
+            statement = statement.where(users_matching(search_query))
+        return statement
+
+    statement = (
+        db.select(
+            Posts.id,
+            Posts.name,
+            Posts.surname,
+            Posts.title,
+            Posts.content,
+            Posts.photo,
+            Posts.date,
+            Users.username.label("author"),
+        )
+        .join(Users, Posts.user_id == Users.id)
+        .order_by(Posts.id)
+    )
+    matches = ranked_matches(search_query)
+    if matches is not None:
+        statement = statement.join(matches, matches.c.post_id == Posts.id)
+    return statement
+
+
+def export_chunks(table, fmt, search_query=None):
+    statement = export_statement(table, search_query)
+    engine = db.engines.get("readonly", db.engine)
+    return serialize_rows(
+        list(statement.selected_columns.keys()), stream_rows(engine, statement), fmt
+    )
+
+
+@bp.route("/admin/export/<any(posts, users):table>.<any(csv, jsonl):fmt>")
+@admin_required
+def export(table, fmt):
+    chunks = export_chunks(table, fmt, request.args.get("search"))
+    response = current_app.response_class(chunks, mimetype=MIMETYPES[fmt])
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="{table}.{fmt}"'
+    )
+    response.vary.add("Accept-Encoding")
+    if "gzip" in request.accept_encodings:
+        response.response = gzip_chunks(chunks)
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+@bp.cli.command("export")
+@click.argument("table", type=click.Choice(EXPORT_TABLES))
+@click.argument(
+    "output", default="-", type=click.Path(dir_okay=False, allow_dash=True)
+)
+@click.option(
+    "--format", "fmt", type=click.Choice(EXPORT_FORMATS), help="Default: from OUTPUT"
+)
+@click.option("--search", help="Same filter as the admin panel's search box")
+@click.option(
+    "--gzip/--no-gzip", "compress", default=None, help="Default: OUTPUT ends in .gz"
+)
+def export_command(table, output, fmt, search, compress):
+    """Stream posts or users to OUTPUT ("-" for stdout) as CSV or JSONL."""
+    name = output[:-3] if output.endswith(".gz") else output
+    if fmt is None:
+        fmt = "jsonl" if name.endswith((".jsonl", ".ndjson")) else "csv"
+    if compress is None:
+        compress = output.endswith(".gz")
+    chunks = export_chunks(table, fmt, search)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    with click.open_file(output, "wb") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+
+
+@bp.route("/admin/delete_user/<int:user_id>")
+@admin_required
+def delete_user(user_id):
+    user = Users.query.get(user_id)
+    if user:
+        # Set-based, in one transaction: the posts go first for the foreign
+        # key, without being loaded. Their photo files are left to the
+        # photo collector.
+        db.session.execute(db.delete(Posts).where(Posts.user_id == user.id))
+        db.session.execute(db.delete(Users).where(Users.id == user.id))
+        db.session.commit()
+        principal_cache.discard(user.username)
+        photo_collector.wake()
+        flash("მომხმარებელი წაშლილია", "success")
+    return redirect(url_for("admin.index"))
+
+
+@bp.route("/admin/edit_user/<int:user_id>", methods=["GET", "POST"])
+@admin_required
+def edit_user(user_id):
+    user = Users.query.get_or_404(user_id)
+    form = EditUserForm(obj=user)
+    if form.validate_on_submit():
+        old_username = user.username
+        user.name = form.name.data
+        user.surname = form.surname.data
+        user.username = form.username.data
+        db.session.commit()
+        principal_cache.discard(old_username, user.username)
+        flash("მომხმარებელი განახლებულია", "success")
+        return redirect(url_for("admin.index"))
+    return render_template(
+        "edit_user.html", form=form, navigation_items=navigation_items
+    )
+
+
+@bp.route("/admin/edit_post/<int:post_id>", methods=["GET", "POST"])
+@admin_required
+def edit_post(post_id):
+    post = Posts.query.get_or_404(post_id)
+    form = EditPostForm(obj=post)
+    if form.validate_on_submit():
+        post.name = form.name.data
+        post.surname = form.surname.data
+        post.title = form.title.data
+        post.content = form.content.data
+        db.session.commit()
+        flash("პოსტი განახლებულია", "success")
+        return redirect(url_for("admin.index"))
+    return render_template(
+        "edit_post.html", form=form, navigation_items=navigation_items
+    )
+
+
+@bp.route("/admin/delete_post/<int:post_id>", methods=["POST"], endpoint="delete_post")
+@admin_required
+def delete_post_admin(post_id):
+    post = Posts.query.get_or_404(post_id)
+    if post:
+        photos = (post.photo, post.thumbnail, post.medium)
+        db.session.delete(post)
+        db.session.commit()
+        release_photo(*photos)
+        flash("პოსტი წაშლილია", "success")
+    return redirect(url_for("admin.index"))
+
+
+@bp.cli.command("check-query-plans")
+def check_query_plans_command():
+    """EXPLAIN the queries issued by the read routes; fail on full scans.
+
+    Drives the GET routes through the test client as the first admin
+    (requests only read, so the data is left untouched), then runs
+    EXPLAIN QUERY PLAN on every captured statement.
+    """
+    from query_plans import StatementRecorder, explain, plan_problems
+
+    admin = Users.query.filter_by(is_admin=True).first()
+    if admin is None:
+        raise click.ClickException("Needs at least one admin user to log in as")
+    post = Posts.query.first()
+    summary = People.query.first()
+    later = encode_cursor([datetime.utcnow(), 0])
+    earlier = encode_cursor([datetime(1970, 1, 1), 0])
+    urls = [
+        "/workers",
+        f"/workers?after={later}",
+        f"/workers?before={earlier}",
+        "/workers?order_by=date_asc",
+        f"/workers?order_by=date_asc&after={earlier}",
+        f"/workers?order_by=date_asc&after={encode_cursor([None, 0])}",
+        "/workers?search=ა",
+        "/workers?search=ა&order_by=relevance",
+        "/admin",
+        f"/admin?posts_after={later}&users_after={encode_cursor([0])}",
+        "/admin?search=ა",
+        "/check?name=ნიკა&surname=ბერიძე",
+        "/check?surname=beridze",
+        "/people",
+        f"/people?after={encode_cursor([1, 'z', 'z'])}",
+        f"/people?before={encode_cursor([1, 'a', 'a'])}",
+        "/people?order_by=last_reported",
+        f"/people?order_by=last_reported&after={encode_cursor([datetime.utcnow(), 'z', 'z'])}",
+        "/people?order_by=surname",
+        f"/people?order_by=surname&after={encode_cursor(['a', 'a'])}",
+        f"/person?surname={summary.surname_key if summary else ''}"
+        f"&name={summary.name_key if summary else ''}",
+        f"/person?surname={summary.surname_key if summary else ''}"
+        f"&name={summary.name_key if summary else ''}&after={later}",
+        f"/view_post/{post.id if post else 1}",
+    ]
+    client = current_app.test_client()
+    with client.session_transaction() as client_session:
+        client_session["username"] = admin.username
+    with StatementRecorder(db.engines.values()) as recorder:
+        for url in urls:
+            # Streamed pages run their template queries as the body is read.
+            client.get(url).get_data()
+        # Lookups made by the write paths.
+        Posts.query.filter_by(photo="").first()
+        referenced_photos(["", "x"])
+        Posts.query.filter_by(user_id=admin.id).all()
+        Posts.query.filter_by(name="", surname="").all()
+
+    failures = 0
+    with db.engine.connect() as connection:
+        for statement, parameters in dict.fromkeys(
+            (statement, tuple(parameters)) for statement, parameters in recorder.statements
+        ):
+            details = explain(connection, statement, parameters)
+            problems = plan_problems(
+                statement, details, {"posts", "users", "people"}
+            )
+            if problems:
+                failures += 1
+                click.echo(" ".join(statement.split()))
+                for problem in problems:
+                    click.echo(f"    {problem}")
+    click.echo(f"Checked {len(recorder.statements)} statements, {failures} bad plans")
+    if failures:
+        raise SystemExit(1)
@@ -0,0 +1,123 @@
+from datetime import datetime
+from functools import wraps
+from typing import Optional
+
+import msgspec
+from flask import Blueprint, current_app, request, session
+
+from auth import viewer
+from cache import cached
+from extensions import db
+from models import Posts, Users
+from pagination import keyset_page
+from posts import post_listing
+
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+
+class Post(msgspec.Struct):
+    """A post as returned by the API.
+
+    Field order matches the columns selected for it, so a result row can be
+    passed positionally: `Post(*row)`.
+    """
+
+    id: int
+    name: str
+    surname: str
+    title: str
+    content: str
+    photo: Optional[str]
+    thumbnail: Optional[str]
+    medium: Optional[str]
+    date: datetime
+    author: str
+
+
+class PostPage(msgspec.Struct):
+    items: list[Post]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class Error(msgspec.Struct):
+    error: str
+
+
+encoder = msgspec.json.Encoder()
+
+
+def respond(body, status=200):
+    return current_app.response_class(
+        encoder.encode(body), status=status, mimetype="application/json"
+    )
+
+
+# Columns in the field order of Post
+API_POST_COLUMNS = (
+    Posts.id,
+    Posts.name,
+    Posts.surname,
+    Posts.title,
+    Posts.content,
+    Posts.photo,
+    Posts.thumbnail,
+    Posts.medium,
+    Posts.date,
+    Users.username,
+)
+
+
+def api_login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "username" not in session:
+            return respond(Error("authentication required"), 401)
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+@bp.route("/posts")
+@api_login_required
+@cached(viewer)
+def posts():
+    """Posts as JSON, searched, ordered and paginated like /workers."""
+    try:
+        limit = int(request.args.get("limit", current_app.config["PAGE_SIZE"]))
+    except ValueError:
+        return respond(Error("limit must be an integer"), 400)
+    limit = max(1, min(limit, current_app.config["API_MAX_PAGE_SIZE"]))
+    query, keys = post_listing(
+        db.session.query(*API_POST_COLUMNS).join(Users, Posts.user_id == Users.id),
+        request.args.get("search"),
+        request.args.get("order_by", "date_desc"),
+    )
+    page = keyset_page(
+        query,
+        keys,
+        limit,
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+    return respond(
+        PostPage(
+            items=[Post(*row) for row in page.items],
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+        )
+    )
+
+
+@bp.route("/posts/<int:post_id>")
+@api_login_required
+@cached(viewer)
+def post(post_id):
+    row = db.session.execute(
+        db.select(*API_POST_COLUMNS)
+        .join(Users, Posts.user_id == Users.id)
+        .where(Posts.id == post_id)
+    ).first()
+    if row is None:
+        return respond(Error("post not found"), 404)
+    return respond(Post(*row))
@@ -0,0 +1,234 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+import click
+from flask import current_app, request
+from flask.cli import with_appcontext
+from werkzeug.http import quote_etag
+from werkzeug.utils import get_content_type
+from werkzeug.wsgi import wrap_file
+
+MANIFEST = "manifest.json"
+# Not shipped as assets: user uploads and the Tailwind sources.
+SKIPPED_FOLDERS = ("uploads", "src")
+# Formats that are not compressed already (woff2, PNG and JPEG are).
+COMPRESSIBLE = (".css", ".js", ".svg", ".eot", ".ttf", ".json", ".txt")
+# Content-Encoding and file suffix of each precompressed variant, preferred first.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def _fingerprinted(path, data):
+    stem, ext = posixpath.splitext(path)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _rewrite_css_urls(path, css, files):
+    """Point the relative url()s of the stylesheet `path` at fingerprinted files.
+
+    Query strings and fragments (e.g. `font.eot?#iefix`) are kept.
+    """
+    folder = posixpath.dirname(path)
+
+    def replace(match):
+        quote, url = match.groups()
+        if re.match(r"[a-z][a-z0-9+.-]*:|/", url, re.IGNORECASE):
+            return match.group(0)  # data:, https:, //host and absolute paths
+        target, suffix = re.match(r"([^?#]*)(.*)", url).groups()
+        resolved = posixpath.normpath(posixpath.join(folder, target))
+        if resolved not in files:
+            return match.group(0)
+        relative = posixpath.relpath(files[resolved], folder)
+        return f"url({quote}{relative}{suffix}{quote})"
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+def _compress(data):
+    """{encoding: bytes} of the variants worth storing for `data`."""
+    variants = {"gzip": gzip.compress(data, 9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass  # Optional: without it only .gz variants are built
+    else:
+        variants["br"] = brotli.compress(data, quality=11)
+    # A variant saving under 5% is not worth a file and a Vary header.
+    return {
+        encoding: compressed
+        for encoding, compressed in variants.items()
+        if len(compressed) < len(data) * 0.95
+    }
+
+
+def build_assets(static_folder, output):
+    """Write content-hashed copies of the static files into `output`.
+
+    Each file gets the first 12 hex digits of its SHA-256 in its name,
+    and compressible ones get .gz (and, with the brotli package, .br)
+    variants next to it. Stylesheets are hashed after their url()s have
+    been pointed at the fingerprinted fonts and images. Returns the
+    manifest, {source path: {"file": ..., "encodings": [...]}}, which is
+    also written to `output`/manifest.json. Earlier builds' files are
+    left in place for pages rendered before the deploy.
+    """
+    output = os.path.abspath(output)
+    sources = {}
+    for root, folders, filenames in os.walk(static_folder):
+        relative_dir = os.path.relpath(root, static_folder)
+        if relative_dir == ".":
+            folders[:] = [
+                folder
+                for folder in folders
+                if folder not in SKIPPED_FOLDERS
+                and os.path.abspath(os.path.join(root, folder)) != output
+                # Another build's output
+                and not os.path.exists(os.path.join(root, folder, MANIFEST))
+            ]
+        for filename in filenames:
+            if filename.startswith("."):
+                continue  # .DS_Store and the like
+            path = posixpath.normpath(
+                posixpath.join(relative_dir.replace(os.sep, "/"), filename)
+            )
+            with open(os.path.join(root, filename), "rb") as handle:
+                sources[path] = handle.read()
+
+    # Stylesheets last: their url()s need the other files' names.
+    files = {
+        path: _fingerprinted(path, data)
+        for path, data in sources.items()
+        if not path.endswith(".css")
+    }
+    for path in sorted(sources):
+        if path.endswith(".css"):
+            css = _rewrite_css_urls(path, sources[path].decode("utf-8"), files)
+            sources[path] = css.encode("utf-8")
+            files[path] = _fingerprinted(path, sources[path])
+
+    manifest = {}
+    for path, data in sorted(sources.items()):
+        target = os.path.join(output, *files[path].split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        variants = {}
+        if path.endswith(COMPRESSIBLE):
+            variants = _compress(data)
+        for encoding, suffix in ENCODINGS:
+            if encoding in variants:
+                with open(target + suffix, "wb") as handle:
+                    handle.write(variants[encoding])
+        with open(target, "wb") as handle:
+            handle.write(data)
+        manifest[path] = {
+            "file": files[path],
+            "encodings": [encoding for encoding, _ in ENCODINGS if encoding in variants],
+        }
+
+    temp_path = os.path.join(output, MANIFEST + ".tmp")
+    with open(temp_path, "w") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(temp_path, os.path.join(output, MANIFEST))
+    return manifest
+
+
+class StaticAssets:
+    """Serve the build_assets() output in place of the plain static files.
+
+    url_for("static", filename=...) resolves through the manifest, and a
+    fingerprinted file is sent precompressed when the client accepts it,
+    with a year-long immutable Cache-Control. The files never change, so
+    their headers are worked out once, when the manifest is loaded.
+    Without a manifest (e.g. during development) the static files are
+    served as they are.
+    """
+
+    def __init__(self, app):
+        self.folder = app.config["ASSETS_FOLDER"]
+        self.cache_control = f"public, max-age={app.config['ASSETS_MAX_AGE']}, immutable"
+        self.urls = {}  # source path -> fingerprinted path under static/
+        # fingerprinted path -> {encoding: (file, size, headers)}, preferred first
+        self.variants = {}
+        path = os.path.join(app.static_folder, self.folder, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as handle:
+                self.load(app.static_folder, json.load(handle))
+        self.send_static_file = app.view_functions["static"]
+        app.view_functions["static"] = self.serve
+        app.url_defaults(self.fingerprint)
+
+    def load(self, static_folder, manifest):
+        for path, entry in manifest.items():
+            url = f"{self.folder}/{entry['file']}"
+            content_type = get_content_type(
+                mimetypes.guess_type(path)[0] or "application/octet-stream", "utf-8"
+            )
+            variants = {}
+            for encoding, suffix in (*ENCODINGS, (None, "")):
+                if encoding is not None and encoding not in entry["encodings"]:
+                    continue
+                file = os.path.join(static_folder, *url.split("/")) + suffix
+                if not os.path.exists(file):
+                    continue
+                headers = [
+                    ("Content-Type", content_type),
+                    ("Cache-Control", self.cache_control),
+                    ("ETag", quote_etag(f"{entry['file']}{suffix}")),
+                ]
+                if encoding:
+                    headers.append(("Content-Encoding", encoding))
+                if entry["encodings"]:
+                    headers.append(("Vary", "Accept-Encoding"))
+                variants[encoding] = (file, os.path.getsize(file), headers)
+            if None in variants:
+                self.urls[path] = url
+                self.variants[url] = variants
+
+    def fingerprint(self, endpoint, values):
+        if endpoint == "static" and values.get("filename") in self.urls:
+            values["filename"] = self.urls[values["filename"]]
+
+    def serve(self, filename):
+        variants = self.variants.get(filename)
+        if variants is None:
+            return self.send_static_file(filename=filename)
+        for encoding, (file, size, headers) in variants.items():
+            if encoding is None or request.accept_encodings[encoding] > 0:
+                break
+        response = current_app.response_class(
+            wrap_file(request.environ, open(file, "rb")),
+            headers=headers,
+            direct_passthrough=True,
+        )
+        response.content_length = size
+        return response.make_conditional(
+            request, accept_ranges=True, complete_length=size
+        )
+
+
+def init_assets(app):
+    app.extensions["static_assets"] = StaticAssets(app)
+    app.cli.add_command(build_assets_command)
+
+
+@click.command("build-assets")
+@click.option("--clean", is_flag=True, help="Delete earlier builds first")
+@with_appcontext
+def build_assets_command(clean):
+    """Fingerprint and precompress static/ for production.
+
+    Run after `npx tailwindcss` has rebuilt style/output.css, then restart
+    the app to serve the new manifest.
+    """
+    static_folder = current_app.static_folder
+    output = os.path.join(static_folder, current_app.config["ASSETS_FOLDER"])
+    if clean:
+        shutil.rmtree(output, ignore_errors=True)
+    manifest = build_assets(static_folder, output)
+    compressed = sum(bool(entry["encodings"]) for entry in manifest.values())
+    click.echo(f"Built {len(manifest)} assets ({compressed} precompressed) in {output}")
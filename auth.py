@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from functools import wraps
+
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    g,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
+
+from cache import TTLCache
+from config import navigation_items
+from extensions import db, hash_pool, ip_throttle, principal_cache, username_throttle
+from forms import LoginForm, RegisterForm
+from hashing import HashPool, HashPoolBusy
+from models import Users
+from throttle import SlidingWindowLimiter
+
+bp = Blueprint("auth", __name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    is_admin: bool
+
+
+def init_auth(app):
+    """Set up the user lookup cache, the hashing pool and the login throttles."""
+    app.extensions["principal_cache"] = TTLCache(app.config["PRINCIPAL_CACHE_TTL"])
+    app.extensions["hash_pool"] = HashPool(
+        app.config["HASH_WORKERS"], app.config["HASH_MAX_PENDING"]
+    )
+    app.extensions["ip_throttle"] = SlidingWindowLimiter(
+        app.config["LOGIN_IP_LIMIT"], app.config["LOGIN_IP_WINDOW"]
+    )
+    app.extensions["username_throttle"] = SlidingWindowLimiter(
+        app.config["LOGIN_USERNAME_LIMIT"], app.config["LOGIN_USERNAME_WINDOW"]
+    )
+
+
+def current_user():
+    """The logged-in user, looked up at most once per request.
+
+    Lookups are also shared between requests for PRINCIPAL_CACHE_TTL
+    seconds; views that change or remove a user must call
+    `principal_cache.discard(username)`. That only reaches the worker
+    that ran the view, so under a multi-process server (`flask serve`)
+    the cache is bypassed.
+    """
+    if "principal" not in g:
+        username = session.get("username")
+        shared = not request.environ.get("wsgi.multiprocess")
+        principal = principal_cache.get(username) if username and shared else None
+        if username and principal is None:
+            user = Users.query.filter_by(username=username).first()
+            if user is not None:
+                principal = Principal(user.id, user.username, user.is_admin)
+                if shared:
+                    principal_cache.set(username, principal)
+        g.principal = principal
+    return g.principal
+
+
+def viewer():
+    """Session values that change how the shared layout renders."""
+    return session.get("username"), session.get("is_admin")
+
+
+def form_viewer():
+    # Pages with a form embed the session's CSRF token; only cache them
+    # once the session already has one.
+    if "csrf_token" not in session:
+        return None
+    return viewer() + (session["csrf_token"],)
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "username" not in session:
+            flash("გთხოვთ ჯერ სისტემაში შეხვიდეთ.", "warning")
+            return redirect(url_for("auth.login"))
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "username" not in session:
+            flash("გთხოვთ ჯერ სისტემაში შეხვიდეთ.", "warning")
+            return redirect(url_for("auth.login"))
+
+        user = current_user()
+
+        if user is None:
+            flash("მომხმარებელი არ მოიძებნა", "danger")
+            return redirect(url_for("posts.home"))
+
+        if not user.is_admin:
+            flash("დაშვებული არ არის", "danger")
+            return redirect(url_for("posts.home"))
+
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def refuse_attempt(template, form, status, retry_after):
+    """Re-render an auth form with a 429/503 and a Retry-After header."""
+    if status == 429:
+        flash("ძალიან ბევრი მცდელობა. სცადეთ მოგვიანებით.", "danger")
+    else:
+        flash("სერვერი გადატვირთულია. სცადეთ ცოტა ხანში.", "danger")
+    response = current_app.make_response(
+        (
+            render_template(template, navigation_items=navigation_items, form=form),
+            status,
+        )
+    )
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    form = LoginForm()
+    if form.validate_on_submit():
+        username = form.username.data
+        password = form.password.data
+        retry_after = max(
+            ip_throttle.retry_after(request.remote_addr),
+            username_throttle.retry_after(username),
+        )
+        if retry_after:
+            return refuse_attempt("login.html", form, 429, retry_after)
+        ip_throttle.hit(request.remote_addr)
+        user = Users.query.filter_by(username=username).first()
+        try:
+            valid = user is not None and hash_pool.check(
+                user.password, password, current_app.config["HASH_TIMEOUT"]
+            )
+        except HashPoolBusy:
+            return refuse_attempt("login.html", form, 503, 1)
+        if valid:
+            username_throttle.reset(username)
+            session["username"] = username
+            session["is_admin"] = user.is_admin
+            return redirect(url_for("posts.home"))
+        else:
+            username_throttle.hit(username)
+            flash("მომხმარებლის სახელი ან პაროლი არასწორია", "danger")
+    return render_template("login.html", navigation_items=navigation_items, form=form)
+
+
+@bp.route("/register", methods=["GET", "POST"])
+def register():
+    form = RegisterForm()
+    if form.validate_on_submit():
+        name = form.name.data
+        surname = form.surname.data
+        username = form.username.data
+        password = form.password.data
+        confirm_password = form.confirm_password.data
+
+        retry_after = ip_throttle.retry_after(request.remote_addr)
+        if retry_after:
+            return refuse_attempt("register.html", form, 429, retry_after)
+        ip_throttle.hit(request.remote_addr)
+        if Users.query.filter_by(username=username).first():
+            flash("ასეთი მომხმარებლის სახელი უკვე არსებობს", "danger")
+        elif password != confirm_password:
+            flash("პაროლები არ ემთხვევა", "danger")
+        else:
+            try:
+                hashed_password = hash_pool.generate(
+                    password, current_app.config["HASH_TIMEOUT"]
+                )
+            except HashPoolBusy:
+                return refuse_attempt("register.html", form, 503, 1)
+            new_user = Users(
+                name=name, surname=surname, username=username, password=hashed_password
+            )
+            db.session.add(new_user)
+            db.session.commit()
+            flash(
+                f"დარეგისტრირებულია ახალი მომხმარებელი: {username}", "success")
+            return redirect(url_for("auth.login"))
+    return render_template(
+        "register.html", navigation_items=navigation_items, form=form
+    )
+
+
+@bp.route("/logout")
+def logout():
+    session.pop("username", None)
+    return redirect(url_for("posts.home"))
@@ -0,0 +1,87 @@
+"""Rows per second and peak memory of `flask import-posts`.
+
+    python -m benchmarks.bulk_import 10000 100000 1000000 --batch-size 1000
+
+Rows are streamed and only one batch is held in memory, so the Python
+heap stays flat as the input grows (`--trace-memory` reports its peak,
+at some cost in speed). Peak RSS also counts SQLite's page cache and
+memory-mapped database pages, which grow with the database up to the
+cache_size and mmap_size pragmas.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.routes import peak_rss_mb
+from benchmarks.seed import FIRST_NAMES, SURNAMES, seed, sentence
+
+
+def write_csv(path, rows, rng, invalid_ratio=0.01):
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["name", "surname", "title", "content", "date"])
+        for index in range(rows):
+            writer.writerow(
+                [
+                    rng.choice(FIRST_NAMES),
+                    rng.choice(SURNAMES),
+                    sentence(rng, rng.randint(3, 8)),
+                    # A few rows miss required fields and get rejected.
+                    "" if rng.random() < invalid_ratio else sentence(rng, 40),
+                    f"2023-{index % 12 + 1:02d}-{index % 28 + 1:02d}T12:00:00",
+                ]
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("sizes", nargs="*", type=int)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-import-")
+    path = os.path.join(work, "bench.db")
+    from extensions import db
+    from factory import create_app
+    from models import Users
+    from posts import import_posts
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    seed(path, users=1, posts=0)
+    rng = random.Random(0)
+
+    for rows in args.sizes or [10_000, 100_000]:
+        source = os.path.join(work, f"{rows}.csv")
+        write_csv(source, rows, rng)
+        with app.app_context(), open(source, encoding="utf-8", newline="") as stream:
+            user_id = db.session.scalar(db.select(Users.id))
+            if args.trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            stats = import_posts(stream, "csv", user_id, args.batch_size)
+            elapsed = time.perf_counter() - start
+        heap = ""
+        if args.trace_memory:
+            heap = f"  peak heap {tracemalloc.get_traced_memory()[1] / 2**20:.1f} MB"
+            tracemalloc.stop()
+        print(
+            f"{rows:>9} rows  {stats.imported:>9} imported  {stats.rejected:>6} rejected"
+            f"  {rows / elapsed:9.0f} rows/s  peak RSS {peak_rss_mb():.0f} MB{heap}"
+        )
+        os.remove(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Bytes, CPU and time to first byte of the listing pages per encoding.
+
+    python -m benchmarks.compression --posts 10000 --requests 100
+
+Every combination of rendering (buffered by render_template or streamed
+in chunks) and Accept-Encoding (identity, gzip and, with the brotli
+package installed, br) fetches each route `--requests` times as the
+seeded admin, with the page cache off so that every response is
+rendered. Bytes are what goes on the wire for one response; CPU is the
+process time spent per response through the test client, compression
+included. Time to first byte and to the last byte are medians over a
+real threaded WSGI server.
+"""
+import argparse
+import http.client
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.routes import CSRF_RE, HTTPClient, login_data, percentile
+from benchmarks.seed import seed
+
+ROUTES = ("/workers", "/admin", "/api/v1/posts?limit=200")
+
+
+def encodings():
+    from streaming import _brotli_available
+
+    available = [("identity", None), ("gzip", "gzip")]
+    if _brotli_available():
+        available.append(("br", "br"))
+    return available
+
+
+def log_in(client):
+    token = CSRF_RE.search(client.get("/login").get_data(as_text=True)).group(1)
+    client.post("/login", data=login_data(token))
+
+
+def test_client_run(app, url, accept, requests):
+    """(bytes per response, CPU ms per response) through the test client."""
+    client = app.test_client()
+    log_in(client)
+    headers = {"Accept-Encoding": accept} if accept else {}
+    size = len(client.get(url, headers=headers).get_data())  # warm up
+    started = time.process_time()
+    for _ in range(requests):
+        client.get(url, headers=headers).get_data()
+    return size, (time.process_time() - started) / requests * 1000
+
+
+def server_run(port, cookie, url, accept, requests):
+    """(median time to first byte, median time to last byte) over HTTP."""
+    headers = {"Cookie": cookie}
+    if accept:
+        headers["Accept-Encoding"] = accept
+    first_bytes, last_bytes = [], []
+    for _ in range(requests):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        started = time.perf_counter()
+        connection.request("GET", url, headers=headers)
+        response = connection.getresponse()
+        response.read(1)
+        first_bytes.append(time.perf_counter() - started)
+        response.read()
+        last_bytes.append(time.perf_counter() - started)
+        connection.close()
+    return percentile(sorted(first_bytes), 0.5), percentile(sorted(last_bytes), 0.5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-compression-")
+    path = os.path.join(work, "bench.db")
+    from werkzeug.serving import make_server
+
+    from extensions import db
+    from factory import create_app
+
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        "PHOTO_GC_INTERVAL": 0,
+    }
+    apps = {
+        streamed: create_app({**config, "STREAM_TEMPLATES": streamed})
+        for streamed in (False, True)
+    }
+    with apps[False].app_context():
+        db.create_all()
+    seed(path, max(10, args.posts // 20), args.posts)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    for streamed, app in apps.items():
+        app.extensions["page_cache"].max_bytes = 0
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        browser = HTTPClient(server.server_port)
+        browser.login()
+        cookie = "; ".join(
+            f"{key}={morsel.value}" for key, morsel in browser.cookies.items()
+        )
+        try:
+            for url in ROUTES:
+                for label, accept in encodings():
+                    size, cpu = test_client_run(app, url, accept, args.requests)
+                    first, last = server_run(
+                        server.server_port, cookie, url, accept, args.requests
+                    )
+                    print(
+                        f"{'streamed' if streamed else 'buffered':<9}"
+                        f" {url:<24} {label:<9} {size / 1024:7.1f} KiB"
+                        f"  cpu {cpu:6.2f} ms  ttfb {first:6.2f} ms"
+                        f"  total {last:6.2f} ms"
+                    )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
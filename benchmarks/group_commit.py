@@ -0,0 +1,124 @@
+"""Post creation under a burst: per-request commits against group commit.
+
+    python -m benchmarks.group_commit --threads 16 --seconds 5
+    python -m benchmarks.group_commit --synchronous FULL
+
+`--threads` logged-in clients POST the /workers form to a real threaded
+WSGI server as fast as they can, once with every request committing its
+own insert and once per GROUP_COMMIT_DELAY value with the group-commit
+writer. Reported are inserts per second and the latency percentiles of
+the POSTs (each answered with its redirect). `--synchronous FULL` makes
+every commit wait for an fsync, which is what group commit amortizes.
+"""
+import argparse
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.routes import HTTPClient, percentile
+from benchmarks.seed import create_schema, seed
+
+
+def burst(app, threads, seconds):
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    clients = [HTTPClient(server.server_port) for _ in range(threads)]
+    for client in clients:
+        client.login()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def drive(client, number):
+        local = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            data = {
+                "name": "ბენჩი",
+                "surname": f"თესტი{number}",
+                "title": "burst",
+                "content": "group commit benchmark",
+                "csrf_token": client.token,
+            }
+            started = time.perf_counter()
+            status, _ = client.request("POST", "/workers", data)
+            local.append(time.perf_counter() - started)
+            local_errors += status != 302
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.perf_counter()
+    pool = [
+        threading.Thread(target=drive, args=(client, number))
+        for number, client in enumerate(clients)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    latencies.sort()
+    return {
+        "inserts_per_second": (len(latencies) - errors[0]) / elapsed,
+        "errors": errors[0],
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--delays", nargs="*", type=float, default=[0, 0.002, 0.01])
+    parser.add_argument("--synchronous", default="NORMAL", choices=["NORMAL", "FULL"])
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-group-commit-")
+    path = os.path.join(work, "bench.db")
+    create_schema(path)
+    seed(path, max(10, args.posts // 20), args.posts)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    # Per-request commits waiting on the write lock would flood the output.
+    logging.getLogger("blacklist.slow_requests").setLevel(logging.ERROR)
+    from factory import create_app
+    from sqlite_profile import PRODUCTION_PRAGMAS
+
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        "SQLITE_PRAGMAS": {**PRODUCTION_PRAGMAS, "synchronous": args.synchronous},
+        "PHOTO_GC_INTERVAL": 0,
+    }
+    modes = [("per-request", {"GROUP_COMMIT": False})] + [
+        (
+            f"group {delay * 1000:g} ms",
+            {"GROUP_COMMIT": True, "GROUP_COMMIT_DELAY": delay},
+        )
+        for delay in args.delays
+    ]
+    for label, mode in modes:
+        app = create_app({**config, **mode})
+        # One address and user for every client: measure writes, not throttles.
+        app.extensions["ip_throttle"].limit = math.inf
+        app.extensions["username_throttle"].limit = math.inf
+        result = burst(app, args.threads, args.seconds)
+        app.extensions["hash_pool"].shutdown()
+        print(
+            f"{label:<14} {result['inserts_per_second']:8.1f} inserts/s"
+            f"  p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+            f"  errors {result['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Latency of ordinary routes while /login is flooded with bad passwords.
+
+    python -m benchmarks.login_flood --flood-threads 32 --probe-threads 4
+
+For each hashing mode ("pool": the app's HashPool, "inline": hashing on
+the request thread as before) the probe clients first measure `--route`
+alone, then again while the flood clients post wrong passwords to
+/login. The throttles are lifted unless `--throttle` is given, so the
+flood really reaches the hashing; with it, the flood is mostly answered
+429 by the per-IP limiter. Flood responses are tallied by status code.
+"""
+import argparse
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from benchmarks.routes import HTTPClient, percentile
+from benchmarks.seed import seed
+
+
+class InlineHashing:
+    """The request-thread hashing the app did before HashPool."""
+
+    def check(self, pwhash, password, timeout=None):
+        from werkzeug.security import check_password_hash
+
+        return check_password_hash(pwhash, password)
+
+    def generate(self, password, timeout=None):
+        from werkzeug.security import generate_password_hash
+
+        return generate_password_hash(password)
+
+
+def drive(clients, request, deadline):
+    """Run `request(client)` from one thread per client until `deadline`."""
+    results = []
+    lock = threading.Lock()
+
+    def loop(client):
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = request(client)
+            local.append((time.perf_counter() - start, status))
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=loop, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def measure(port, route, probe_threads, flood_threads, seconds):
+    probes = [HTTPClient(port) for _ in range(probe_threads)]
+    for client in probes:
+        client.login()
+    flooders = [HTTPClient(port) for _ in range(flood_threads)]
+    for client in flooders:
+        client.login()
+
+    deadline = time.perf_counter() + seconds
+    flooding, flood = drive(
+        flooders,
+        lambda client: client.request(
+            "POST",
+            "/login",
+            {"username": "user0", "password": "wrong", "csrf_token": client.token},
+        )[0],
+        deadline,
+    )
+    probing, probed = drive(
+        probes, lambda client: client.request("GET", route)[0], deadline
+    )
+    for thread in flooding + probing:
+        thread.join()
+    latencies = sorted(duration for duration, _ in probed)
+    return latencies, Counter(status for _, status in flood)
+
+
+def report(label, latencies, flood, seconds):
+    line = (
+        f"{label:<14} p50 {percentile(latencies, 0.5):8.2f} ms"
+        f"  p95 {percentile(latencies, 0.95):8.2f} ms"
+        f"  p99 {percentile(latencies, 0.99):8.2f} ms"
+        f"  {len(latencies) / seconds:7.1f} req/s"
+    )
+    if flood:
+        statuses = ", ".join(
+            f"{status}: {count}" for status, count in sorted(flood.items())
+        )
+        line += f"  flood {sum(flood.values()) / seconds:6.1f} req/s ({statuses})"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--route", default="/view_post/1")
+    parser.add_argument("--probe-threads", type=int, default=4)
+    parser.add_argument("--flood-threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--modes", nargs="*", default=["pool", "inline"])
+    parser.add_argument("--throttle", action="store_true")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-flood-")
+    path = os.path.join(work, "bench.db")
+    from werkzeug.serving import make_server
+
+    from extensions import db
+    from factory import create_app
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    seed(path, users=max(10, args.posts // 20), posts=args.posts)
+    if not args.throttle:
+        app.extensions["ip_throttle"].limit = math.inf
+        app.extensions["username_throttle"].limit = math.inf
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    logging.getLogger("blacklist.slow_requests").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    pool = app.extensions["hash_pool"]
+    try:
+        for mode in args.modes:
+            app.extensions["hash_pool"] = pool if mode == "pool" else InlineHashing()
+            for flood_threads in (0, args.flood_threads):
+                latencies, flood = measure(
+                    server.server_port,
+                    args.route,
+                    args.probe_threads,
+                    flood_threads,
+                    args.seconds,
+                )
+                label = f"{mode} {'flood' if flood_threads else 'idle'}"
+                report(label, latencies, flood, args.seconds)
+    finally:
+        server.shutdown()
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
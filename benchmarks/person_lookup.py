@@ -0,0 +1,87 @@
+"""Latency of the /check person lookup (lookup.find_people).
+
+    python -m benchmarks.person_lookup --posts 1000000
+
+Queries mix exact Georgian spellings, Latin transliterations, typos and
+surname-only lookups against surnames drawn from the seeded ones.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.routes import percentile
+from benchmarks.seed import FIRST_NAMES, SURNAMES, seed
+from names import normalize_name
+
+
+def typo(rng, text):
+    position = rng.randrange(len(text))
+    return text[:position] + text[position + 1 :]
+
+
+def queries(rng, count):
+    for _ in range(count):
+        name, surname = rng.choice(FIRST_NAMES), rng.choice(SURNAMES)
+        kind = rng.randrange(4)
+        if kind == 1:
+            name = normalize_name(name).title()
+            surname = normalize_name(surname).title()
+        elif kind == 2:
+            surname = typo(rng, normalize_name(surname))
+        elif kind == 3:
+            name = ""
+        yield name, surname
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--surnames", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--db", help="database file to reuse between runs")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-lookup-")
+    path = os.path.abspath(args.db or os.path.join(work, "bench.db"))
+    from extensions import db
+    from factory import create_app
+    from lookup import find_people
+    from models import Posts
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        }
+    )
+    with app.app_context():
+        db.create_all()
+        empty = db.session.query(Posts.id).first() is None
+    if empty:
+        start = time.perf_counter()
+        seed(path, max(10, args.posts // 20), args.posts, surnames=args.surnames)
+        print(f"Seeded {args.posts} posts in {time.perf_counter() - start:.1f} s")
+
+    rng = random.Random(0)
+    latencies = []
+    found = 0
+    with app.app_context():
+        for name, surname in queries(rng, args.queries):
+            start = time.perf_counter()
+            people = find_people(name, surname)
+            latencies.append(time.perf_counter() - start)
+            found += bool(people)
+            db.session.rollback()
+    latencies.sort()
+    print(
+        f"{args.queries} lookups  p50 {percentile(latencies, 0.5):.2f} ms"
+        f"  p95 {percentile(latencies, 0.95):.2f} ms"
+        f"  p99 {percentile(latencies, 0.99):.2f} ms"
+        f"  {found} with candidates"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Latency and throughput of the main routes against a seeded database.
+
+    python -m benchmarks.routes --posts 100000 --output before.json
+    python -m benchmarks.routes --posts 100000 --output after.json
+    python -m benchmarks.routes --compare before.json after.json
+
+Each route is driven through the Flask test client (one request at a
+time, so per-request SQL counts are exact) and through a real threaded
+WSGI server hammered by `--threads` clients. Pass `--db` to keep the
+seeded database between runs; seeding a million posts takes a while.
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from benchmarks.seed import PASSWORD, SURNAMES, seed
+
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def summarize(route, mode, latencies, errors, elapsed, statements):
+    latencies.sort()
+    requests = len(latencies)
+    return {
+        "route": route,
+        "mode": mode,
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0,
+        "sql_per_request": round(statements / requests, 2) if requests else 0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def build_routes(app, db, Posts, encode_cursor):
+    """(name, method, url factory) for every benchmarked route."""
+    with app.app_context():
+        last_id = db.session.query(db.func.max(Posts.id)).scalar() or 1
+        middle = (
+            db.session.query(Posts.date, Posts.id)
+            .order_by(Posts.date.desc(), Posts.id.desc())
+            .offset(last_id // 2)
+            .first()
+        )
+    deep = f"/workers?after={encode_cursor(list(middle))}" if middle else "/workers"
+    return [
+        ("workers", "GET", lambda rng: "/workers"),
+        ("workers_deep", "GET", lambda rng: deep),
+        (
+            "workers_search",
+            "GET",
+            lambda rng: "/workers?" + urlencode({"search": rng.choice(SURNAMES)[:4]}),
+        ),
+        ("admin", "GET", lambda rng: "/admin"),
+        ("view_post", "GET", lambda rng: f"/view_post/{rng.randint(1, last_id)}"),
+        ("login_form", "GET", lambda rng: "/login"),
+        ("login", "POST", lambda rng: "/login"),
+    ]
+
+
+def login_data(token):
+    return {"username": "user0", "password": PASSWORD, "csrf_token": token}
+
+
+def run_test_client(app, routes, counter, requests, warmup):
+    client = app.test_client()
+    token = CSRF_RE.search(client.get("/login").get_data(as_text=True)).group(1)
+    client.post("/login", data=login_data(token))
+    results = []
+    for name, method, url in routes:
+        rng = random.Random(0)
+        latencies = []
+        errors = statements = 0
+        for index in range(warmup + requests):
+            before = counter.count
+            start = time.perf_counter()
+            if method == "POST":
+                response = client.post(url(rng), data=login_data(token))
+            else:
+                response = client.get(url(rng))
+            response.get_data()  # streamed pages render as they are read
+            duration = time.perf_counter() - start
+            if index < warmup:
+                continue
+            latencies.append(duration)
+            statements += counter.count - before
+            errors += response.status_code >= 400
+        results.append(
+            summarize(
+                name, "test_client", latencies, errors, sum(latencies), statements
+            )
+        )
+        print_result(results[-1])
+    return results
+
+
+class HTTPClient:
+    """One simulated browser: keeps its session cookie across requests."""
+
+    def __init__(self, port):
+        self.port = port
+        self.cookies = SimpleCookie()
+        self.token = None
+
+    def request(self, method, url, data=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        headers = {}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(
+                f"{key}={morsel.value}" for key, morsel in self.cookies.items()
+            )
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        connection.request(method, url, body=body, headers=headers)
+        response = connection.getresponse()
+        payload = response.read()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            self.cookies.load(header)
+        connection.close()
+        return response.status, payload
+
+    def login(self):
+        _, page = self.request("GET", "/login")
+        self.token = CSRF_RE.search(page.decode()).group(1)
+        self.request("POST", "/login", login_data(self.token))
+
+
+def run_server(app, routes, counter, threads, seconds):
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    clients = [HTTPClient(server.server_port) for _ in range(threads)]
+    for client in clients:
+        client.login()
+
+    results = []
+    try:
+        for name, method, url in routes:
+            latencies = []
+            errors = [0]
+            lock = threading.Lock()
+            deadline = time.perf_counter() + seconds
+
+            def drive(client, seed_value):
+                rng = random.Random(seed_value)
+                local = []
+                local_errors = 0
+                while time.perf_counter() < deadline:
+                    data = login_data(client.token) if method == "POST" else None
+                    start = time.perf_counter()
+                    status, _ = client.request(method, url(rng), data)
+                    local.append(time.perf_counter() - start)
+                    local_errors += status >= 400
+                with lock:
+                    latencies.extend(local)
+                    errors[0] += local_errors
+
+            before = counter.count
+            start = time.perf_counter()
+            pool = [
+                threading.Thread(target=drive, args=(client, index))
+                for index, client in enumerate(clients)
+            ]
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            results.append(
+                summarize(
+                    name,
+                    f"server_{threads}_threads",
+                    latencies,
+                    errors[0],
+                    elapsed,
+                    counter.count - before,
+                )
+            )
+            print_result(results[-1])
+    finally:
+        server.shutdown()
+    return results
+
+
+def print_result(result):
+    print(
+        f"{result['mode']:<18} {result['route']:<15}"
+        f" p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms"
+        f"  p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:8.1f} req/s"
+        f"  {result['sql_per_request']:5.2f} sql/req  errors {result['errors']}"
+        f"  rss {result['peak_rss_mb']:.0f} MB"
+    )
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old_path, new_path):
+    with open(old_path) as handle:
+        old = {(r["mode"], r["route"]): r for r in json.load(handle)["results"]}
+    with open(new_path) as handle:
+        new = json.load(handle)["results"]
+
+    def change(before, after):
+        return f"{(after - before) / before * 100:+7.1f}%" if before else "    n/a"
+
+    for result in new:
+        base = old.get((result["mode"], result["route"]))
+        if base is None:
+            continue
+        print(
+            f"{result['mode']:<18} {result['route']:<15}"
+            f" p50 {change(base['p50_ms'], result['p50_ms'])}"
+            f"  p99 {change(base['p99_ms'], result['p99_ms'])}"
+            f"  throughput {change(base['throughput_rps'], result['throughput_rps'])}"
+            f"  sql/req {base['sql_per_request']} -> {result['sql_per_request']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--users", type=int, help="default: posts / 20")
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--db", help="database file to reuse between runs")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--no-page-cache", action="store_true")
+    parser.add_argument("--skip-server", action="store_true")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    work = tempfile.mkdtemp(prefix="blacklist-bench-")
+    path = os.path.abspath(args.db or os.path.join(work, "bench.db"))
+    from extensions import db
+    from factory import create_app
+    from models import Posts
+    from pagination import encode_cursor
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+            "UPLOAD_FOLDER": os.path.splitext(path)[0] + "_uploads",
+        }
+    )
+    if args.no_page_cache:
+        app.extensions["page_cache"].max_bytes = 0
+    # Every login comes from one address and user: measure the route, not
+    # the throttles.
+    app.extensions["ip_throttle"].limit = math.inf
+    app.extensions["username_throttle"].limit = math.inf
+
+    with app.app_context():
+        db.create_all()
+        posts = db.session.query(db.func.count(Posts.id)).scalar()
+    if not posts:
+        users = args.users or max(10, args.posts // 20)
+        start = time.perf_counter()
+        seed(path, users, args.posts, args.photos, app.config["UPLOAD_FOLDER"])
+        print(
+            f"Seeded {users} users and {args.posts} posts"
+            f" in {time.perf_counter() - start:.1f} s"
+        )
+        posts = args.posts
+
+    counter = StatementCounter()
+    event.listen(Engine, "before_cursor_execute", counter)
+    routes = build_routes(app, db, Posts, encode_cursor)
+    results = run_test_client(app, routes, counter, args.requests, args.warmup)
+    if not args.skip_server:
+        results += run_server(app, routes, counter, args.threads, args.seconds)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "posts": posts,
+            "page_cache": not args.no_page_cache,
+            "requests": args.requests,
+            "threads": args.threads,
+            "seconds": args.seconds,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Wrote {args.output}")
+    app.extensions["variant_pool"].shutdown()
+
+
+if __name__ == "__main__":
+    main()
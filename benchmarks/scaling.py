@@ -0,0 +1,173 @@
+"""Throughput of `flask serve` against its number of worker processes.
+
+    python -m benchmarks.scaling --workers 1 2 4 --clients 16 --seconds 5
+    python -m benchmarks.scaling --no-write-lock
+
+For every worker count the app is served by server.serve() on a local
+port and `--clients` logged-in clients drive a mix of the post list,
+single posts and (at `--write-ratio`) new posts through it. Reported per
+worker count are requests per second, latency percentiles, 5xx answers
+and whether every accepted post reached the database. `--no-write-lock`
+turns SQLITE_WRITE_LOCK off, so writers race for SQLite's own lock.
+Throughput only grows with workers up to the number of CPU cores.
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import signal
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+
+from benchmarks.routes import HTTPClient, percentile
+from benchmarks.seed import create_schema, seed
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(app, port, workers, threads):
+    from server import serve
+
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            serve(app, "127.0.0.1", port, workers, threads)
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return pid
+        except OSError:
+            time.sleep(0.05)
+    os.kill(pid, signal.SIGTERM)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def drive(port, clients, seconds, write_ratio, posts):
+    sessions = [HTTPClient(port) for _ in range(clients)]
+    for client in sessions:
+        client.login()
+    latencies = []
+    counts = {"errors": 0, "posted": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(client, number):
+        rng = random.Random(number)
+        local = []
+        errors = posted = 0
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            started = time.perf_counter()
+            if roll < write_ratio:
+                status, _ = client.request(
+                    "POST",
+                    "/workers",
+                    {
+                        "name": "მასშტაბი",
+                        "surname": f"კლიენტი{number}",
+                        "title": "scaling",
+                        "content": "scaling benchmark",
+                        "csrf_token": client.token,
+                    },
+                )
+                posted += status == 302
+            elif roll < (1 + write_ratio) / 2:
+                status, _ = client.request("GET", "/workers")
+            else:
+                status, _ = client.request(
+                    "GET", f"/view_post/{rng.randint(1, posts)}"
+                )
+            local.append(time.perf_counter() - started)
+            errors += status >= 500
+        with lock:
+            latencies.extend(local)
+            counts["errors"] += errors
+            counts["posted"] += posted
+
+    started = time.perf_counter()
+    pool = [
+        threading.Thread(target=run, args=(client, number))
+        for number, client in enumerate(sessions)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+        **counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", nargs="*", type=int, default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=8, help="Per worker")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--no-write-lock", action="store_true")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-scaling-")
+    path = os.path.join(work, "bench.db")
+    create_schema(path)
+    seed(path, max(10, args.posts // 20), args.posts)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    logging.getLogger("blacklist.slow_requests").setLevel(logging.ERROR)
+    from factory import create_app
+
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        "SQLITE_WRITE_LOCK": not args.no_write_lock,
+        "PHOTO_GC_INTERVAL": 0,
+    }
+    print(f"{os.cpu_count()} CPUs, SQLITE_WRITE_LOCK {config['SQLITE_WRITE_LOCK']}")
+    for workers in args.workers:
+        before = sqlite3.connect(path).execute("SELECT count(*) FROM posts")
+        before = before.fetchone()[0]
+        app = create_app(config)
+        # One address and user for every client: measure serving, not throttles.
+        app.extensions["ip_throttle"].limit = math.inf
+        app.extensions["username_throttle"].limit = math.inf
+        port = free_port()
+        pid = start_server(app, port, workers, args.threads)
+        try:
+            result = drive(
+                port, args.clients, args.seconds, args.write_ratio, args.posts
+            )
+        finally:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        after = sqlite3.connect(path).execute("SELECT count(*) FROM posts")
+        stored = after.fetchone()[0] - before
+        print(
+            f"{workers:>2} workers {result['requests_per_second']:8.1f} req/s"
+            f"  p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms"
+            f"  5xx {result['errors']}"
+            f"  posts {result['posted']} accepted, {stored} stored"
+        )
+
+
+if __name__ == "__main__":
+    main()
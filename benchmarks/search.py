@@ -0,0 +1,85 @@
+"""Compare LIKE scans against the posts_fts index.
+
+    python -m benchmarks.search --rows 10000 100000 1000000 --repeat 5
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from search import POSTS_FTS_DDL, match_expression
+
+LETTERS = "აბგდევზთიკლმნოპჟრსტუფქღყშჩცძწჭხჯჰ"
+
+LIKE_SQL = """
+    SELECT id FROM posts
+    WHERE name LIKE :q OR surname LIKE :q OR title LIKE :q OR content LIKE :q
+"""
+FTS_SQL = """
+    SELECT posts.id FROM posts
+    JOIN (SELECT rowid AS post_id, bm25(posts_fts) AS rank
+          FROM posts_fts WHERE posts_fts MATCH :q) AS m ON m.post_id = posts.id
+    ORDER BY m.rank
+"""
+
+
+def word(rng, low=4, high=10):
+    return "".join(rng.choice(LETTERS) for _ in range(rng.randint(low, high)))
+
+
+def build(path, rows, seed=0):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE posts (id INTEGER PRIMARY KEY, name TEXT, surname TEXT,"
+        " title TEXT, content TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO posts (name, surname, title, content) VALUES (?, ?, ?, ?)",
+        (
+            (
+                word(rng),
+                word(rng),
+                " ".join(word(rng) for _ in range(3)),
+                " ".join(word(rng) for _ in range(20)),
+            )
+            for _ in range(rows)
+        ),
+    )
+    for statement in POSTS_FTS_DDL:
+        conn.execute(statement)
+    conn.commit()
+    return conn
+
+
+def timed(conn, sql, params, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", nargs="*", type=int, default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = build(os.path.join(tmp, "bench.db"), rows)
+            term = conn.execute("SELECT surname FROM posts LIMIT 1").fetchone()[0][:4]
+            like_ms = timed(conn, LIKE_SQL, {"q": f"%{term}%"}, args.repeat)
+            fts_ms = timed(conn, FTS_SQL, {"q": match_expression(term)}, args.repeat)
+            conn.close()
+        print(f"{rows:>9} posts  LIKE {like_ms:9.2f} ms  FTS5 {fts_ms:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Fill a blackList database with synthetic users and posts.
+
+    python -m benchmarks.seed bench.db --posts 100000 --photos 20
+
+The schema is created from the models when the file is new. Every user's
+password is PASSWORD and the first user is an admin.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from PIL import Image
+from werkzeug.security import generate_password_hash
+
+from images import make_variants
+from names import normalize_name, trigrams
+from uploads import store_existing
+
+PASSWORD = "benchmark"
+BATCH_SIZE = 10_000
+
+FIRST_NAMES = [
+    "გიორგი", "დავით", "ნიკა", "ლუკა", "ირაკლი", "ლევან", "ზურაბ", "თამაზ",
+    "ნინო", "მარიამ", "ანა", "თამარ", "ეკა", "ნათია", "სალომე", "ქეთევან",
+]
+SURNAMES = [
+    "ბერიძე", "კაპანაძე", "გელაშვილი", "მაისურაძე", "გიორგაძე", "ლომიძე",
+    "წიკლაური", "ბოლქვაძე", "ნოზაძე", "ხუციშვილი", "ჯაფარიძე", "შენგელია",
+    "კვარაცხელია", "ჩიქოვანი", "მამულაშვილი", "ქავთარაძე",
+]
+# Syllables and endings combined into extra surnames, so lookups run
+# against a realistic number of distinct people.
+SYLLABLES = [
+    "ბე", "რი", "კა", "პა", "ნა", "გე", "ლა", "მა", "სუ", "რა", "ლო", "მი",
+    "წი", "კლა", "ხუ", "ცი", "ჯა", "ფა", "ქავ", "თა", "ჩი", "ქო", "ვა", "ნი",
+]
+ENDINGS = ["ძე", "შვილი", "ია", "ავა", "ური", "ანი", "ელი"]
+WORDS = [
+    "ხელოსანი", "სამუშაო", "თანხა", "დაუმთავრებელი", "რემონტი", "სახურავი",
+    "ელექტროობა", "სანტექნიკა", "ფილა", "კარი", "ფანჯარა", "ავანსი", "ვადა",
+    "არ", "დაბრუნდა", "ტელეფონი", "გათიშა", "ხარისხი", "ცუდი", "ბინა",
+]
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_surnames(rng, count):
+    """SURNAMES plus up to `count` generated ones."""
+    surnames = set(SURNAMES)
+    for _ in range(count * 2):
+        if len(surnames) >= len(SURNAMES) + count:
+            break
+        syllables = rng.choices(SYLLABLES, k=rng.randint(2, 3))
+        surnames.add("".join(syllables) + rng.choice(ENDINGS))
+    return sorted(surnames)
+
+
+def timestamp(value):
+    # The format SQLAlchemy's SQLite DateTime type reads back.
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def create_schema(path):
+    """Create the application's tables (and FTS index) in a new database."""
+    from extensions import db
+    from factory import create_app
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.abspath(path)}"})
+    with app.app_context():
+        db.create_all()
+
+
+def make_photos(upload_folder, count, rng):
+    """Store `count` distinct JPEGs with their variants; return their columns."""
+    photos = []
+    for _ in range(count):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image = Image.new("RGB", (1200, 900), color)
+        corner = (rng.randrange(1000), rng.randrange(700), 1200, 900)
+        image.paste(tuple(255 - c for c in color), corner)
+        os.makedirs(upload_folder, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=upload_folder, suffix=".jpg", delete=False
+        ) as temp:
+            image.save(temp, "JPEG", quality=85)
+        photo, _ = store_existing(upload_folder, os.path.basename(temp.name))
+        variants = make_variants(upload_folder, photo)
+        photos.append((photo, variants["thumbnail"], variants["medium"]))
+    return photos
+
+
+def seed(
+    path,
+    users,
+    posts,
+    photos=0,
+    upload_folder=None,
+    photo_ratio=0.3,
+    surnames=5000,
+    seed=0,
+):
+    """Insert `users` users and `posts` posts into the database at `path`.
+
+    Post dates are spread over the last five years, a `photo_ratio` share
+    of posts points at one of `photos` generated images and surnames are
+    drawn from about `surnames` distinct ones.
+    """
+    rng = random.Random(seed)
+    surname_pool = make_surnames(rng, surnames)
+    keys = {name: normalize_name(name) for name in FIRST_NAMES + surname_pool}
+    stored = make_photos(upload_folder, photos, rng) if photos else []
+    password = generate_password_hash(PASSWORD)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (name, surname, username, password, is_admin)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    rng.choice(FIRST_NAMES),
+                    rng.choice(SURNAMES),
+                    f"user{index}",
+                    password,
+                    index == 0,
+                )
+                for index in range(users)
+            ),
+        )
+    first_user, last_user = conn.execute(
+        "SELECT MIN(id), MAX(id) FROM users"
+    ).fetchone()
+    now = datetime.utcnow()
+    span = int(timedelta(days=5 * 365).total_seconds())
+
+    def post_rows(count):
+        for _ in range(count):
+            photo = (None, None, None)
+            if stored and rng.random() < photo_ratio:
+                photo = rng.choice(stored)
+            name, surname = rng.choice(FIRST_NAMES), rng.choice(surname_pool)
+            yield (
+                name,
+                surname,
+                keys[name],
+                keys[surname],
+                sentence(rng, rng.randint(3, 8)),
+                sentence(rng, rng.randint(20, 80)),
+                *photo,
+                rng.randint(first_user, last_user),
+                timestamp(now - timedelta(seconds=rng.randrange(span))),
+            )
+
+    remaining = posts
+    while remaining:
+        batch = min(remaining, BATCH_SIZE)
+        with conn:
+            conn.executemany(
+                "INSERT INTO posts (name, surname, name_key, surname_key, title,"
+                " content, photo, thumbnail, medium, user_id, date)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                post_rows(batch),
+            )
+        remaining -= batch
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO name_trigrams (trigram, name_key) VALUES (?, ?)",
+            (
+                (trigram, key)
+                for key in set(keys.values())
+                for trigram in trigrams(key)
+            ),
+        )
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("database")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--photos", type=int, default=20)
+    parser.add_argument("--upload-folder", default="static/uploads")
+    args = parser.parse_args()
+    if not os.path.exists(args.database):
+        create_schema(args.database)
+    seed(args.database, args.users, args.posts, args.photos, args.upload_folder)
+    print(f"Seeded {args.users} users and {args.posts} posts into {args.database}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Mixed read/write load against SQLite's defaults and the production profile.
+
+    python -m benchmarks.sqlite_concurrency --threads 16 --seconds 5
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, exc, text
+
+from sqlite_profile import PRODUCTION_PRAGMAS, apply_pragmas
+
+SCHEMA = """
+    CREATE TABLE posts (
+        id INTEGER PRIMARY KEY, name TEXT, surname TEXT, title TEXT,
+        content TEXT, user_id INTEGER, date DATETIME
+    )
+"""
+READ = text("SELECT id, name, surname, title FROM posts ORDER BY id DESC LIMIT 50")
+WRITE = text(
+    "INSERT INTO posts (name, surname, title, content, user_id, date)"
+    " VALUES ('ნიკა', 'ბერიძე', 'სათაური', 'აღწერა', 1, :date)"
+)
+
+
+def make_engine(path, pragmas):
+    engine = create_engine(f"sqlite:///{path}", pool_size=32, max_overflow=0)
+    if pragmas:
+        apply_pragmas(engine, pragmas)
+    return engine
+
+
+def run(engine, threads, seconds, write_ratio):
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = {"reads": 0, "writes": 0, "locked": 0}
+        local_latencies = []
+        while time.perf_counter() < deadline:
+            write = rng.random() < write_ratio
+            start = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    if write:
+                        conn.execute(WRITE, {"date": datetime.utcnow()})
+                    else:
+                        conn.execute(READ).fetchall()
+            except exc.OperationalError:
+                local["locked"] += 1
+                continue
+            local_latencies.append(time.perf_counter() - start)
+            local["writes" if write else "reads"] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+            latencies.extend(local_latencies)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float("nan")
+    return counts, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for label, pragmas in [("default", {}), ("production", PRODUCTION_PRAGMAS)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            engine = make_engine(path, pragmas)
+            with engine.begin() as conn:
+                conn.execute(text(SCHEMA))
+            counts, p99 = run(engine, args.threads, args.seconds, args.write_ratio)
+            engine.dispose()
+        ops = (counts["reads"] + counts["writes"]) / args.seconds
+        print(
+            f"{label:>10}: {ops:9.0f} ops/s  reads {counts['reads']:>8}"
+            f"  writes {counts['writes']:>7}  locked {counts['locked']:>5}"
+            f"  p99 {p99:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Cold start of the app: import time and time to the first response.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --runs 20 --import-budget 700 --first-response-budget 800
+
+Every run is a fresh interpreter (bytecode already compiled) that times
+importing the application's modules, create_app() and a first GET of
+`--route` through the test client against an empty database. Medians
+are compared with the budgets; exceeding either exits with status 1, so
+CI can fail a change that slows startup down.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.routes import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from factory import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get(sys.argv[1])
+responded = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import": imported - started,
+    "create_app": created - imported,
+    "first_response": responded - started,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+# Only `flask db`, the check-query-plans command and the image workers
+# need these; a web process that imports them has regressed.
+LAZY_MODULES = ("alembic", "flask_migrate", "PIL", "query_plans")
+
+
+def run_once(route, work):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(work, 'startup.db')}",
+        SESSION_SQLITE_PATH=os.path.join(work, "sessions.db"),
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, route],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--route", default="/login")
+    parser.add_argument("--import-budget", type=float, default=900, help="ms")
+    parser.add_argument("--first-response-budget", type=float, default=1000, help="ms")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-startup-")
+    run_once(args.route, work)  # compile bytecode, create the session store
+    runs = [run_once(args.route, work) for _ in range(args.runs)]
+
+    failed = False
+    for status in {run["status"] for run in runs} - {200}:
+        print(f"{args.route} answered {status}")
+        failed = True
+    for key in ("import", "create_app", "first_response"):
+        timings = sorted(run[key] for run in runs)
+        print(
+            f"{key:<15} p50 {percentile(timings, 0.5):8.1f} ms"
+            f"  max {timings[-1] * 1000:8.1f} ms"
+        )
+    loaded = [name for name in LAZY_MODULES if name in runs[0]["modules"]]
+    if loaded:
+        print(f"Imported at startup: {', '.join(loaded)}")
+        failed = True
+
+    for key, budget in (
+        ("import", args.import_budget),
+        ("first_response", args.first_response_budget),
+    ):
+        median = percentile(sorted(run[key] for run in runs), 0.5)
+        if median > budget:
+            print(f"{key} median {median:.1f} ms is over its {budget:.0f} ms budget")
+            failed = True
+    if failed:
+        raise SystemExit(1)
+    print("Within budget")
+
+
+if __name__ == "__main__":
+    main()
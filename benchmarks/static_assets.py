@@ -0,0 +1,124 @@
+"""Bytes and requests spent on a page's static assets, plain against built.
+
+    python -m benchmarks.static_assets --page / --repeats 200
+
+"plain" serves static/ as it is (no manifest); "built" runs
+build_assets() first and serves the fingerprinted, precompressed copies.
+A first visit fetches every stylesheet, script, image and font the page
+and its stylesheets refer to, with `Accept-Encoding: br, gzip`. A repeat
+visit replays what a browser with those responses cached would send:
+a conditional request for each asset it has to revalidate, nothing for
+the immutable ones. Serving time is the mean over `--repeats` requests.
+"""
+import argparse
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+CSS_URL_RE = re.compile(r"""url\(\s*['"]?([^'")?#]+)""")
+HEADERS = {"Accept-Encoding": "br, gzip"}
+
+
+def page_assets(client, page):
+    """{url: first response} for the assets of `page`, fonts included."""
+    pending = list(dict.fromkeys(ASSET_RE.findall(client.get(page).get_data(True))))
+    responses = {}
+    while pending:
+        url = pending.pop()
+        if url in responses or "/uploads/" in url:
+            continue
+        response = client.get(url, headers=HEADERS)
+        if response.status_code != 200:
+            continue
+        responses[url] = response
+        if response.mimetype == "text/css":
+            css = client.get(url).get_data(True)  # uncompressed, not counted
+            for target in CSS_URL_RE.findall(css):
+                if not urlsplit(target).scheme and not target.startswith("/"):
+                    pending.append(
+                        posixpath.normpath(
+                            posixpath.join(posixpath.dirname(url), target)
+                        )
+                    )
+    return responses
+
+
+def repeat_visit(client, responses):
+    """Requests and bytes a browser holding `responses` spends again."""
+    requests = transferred = 0
+    for url, response in responses.items():
+        if "immutable" in response.headers.get("Cache-Control", ""):
+            continue
+        revalidated = client.get(
+            url, headers={**HEADERS, "If-None-Match": response.headers["ETag"]}
+        )
+        requests += 1
+        transferred += len(revalidated.data)
+    return requests, transferred
+
+
+def serve_time(client, urls, repeats):
+    started = time.perf_counter()
+    for index in range(repeats):
+        client.get(urls[index % len(urls)], headers=HEADERS).close()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def measure(app, page, repeats):
+    client = app.test_client()
+    responses = page_assets(client, page)
+    first = sum(len(response.data) for response in responses.values())
+    requests, repeat = repeat_visit(client, responses)
+    return {
+        "assets": len(responses),
+        "first_visit_bytes": first,
+        "repeat_requests": requests,
+        "repeat_bytes": repeat,
+        "serve_ms": serve_time(client, list(responses), repeats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", default="/")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-static-")
+    from assets import build_assets
+    from extensions import db
+    from factory import create_app
+
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(work, 'bench.db')}",
+        "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        "PHOTO_GC_INTERVAL": 0,
+    }
+    folder = f"bench-{os.path.basename(work)}"
+    plain = create_app({**config, "ASSETS_FOLDER": folder})
+    with plain.app_context():
+        db.create_all()
+    output = os.path.join(plain.static_folder, folder)
+    try:
+        build_assets(plain.static_folder, output)
+        built = create_app({**config, "ASSETS_FOLDER": folder})
+        for label, app in (("plain", plain), ("built", built)):
+            result = measure(app, args.page, args.repeats)
+            print(
+                f"{label:<6} {result['assets']:3d} assets"
+                f"  first visit {result['first_visit_bytes'] / 1024:8.1f} KiB"
+                f"  repeat visit {result['repeat_requests']:3d} requests"
+                f" {result['repeat_bytes'] / 1024:6.1f} KiB"
+                f"  {result['serve_ms']:6.2f} ms/asset"
+            )
+    finally:
+        shutil.rmtree(output, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""First-request and steady-state render time of every page template.
+
+    python -m benchmarks.templates --runs 5 --requests 50
+
+Every run is a fresh interpreter that requests each page once and then
+`--requests` more times through the test client (page cache off),
+recording per template how long loading it took (compiling the source,
+or reading the bytecode cache) and how long each render took. "source"
+runs have no bytecode cache; "bytecode" runs read one filled by
+`flask compile-templates`. First render includes loading base.html and
+the macros a page pulls in; steady is the median of the later renders.
+Numbers are medians over the runs, in ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.seed import create_schema, seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANONYMOUS_PAGES = ("/login", "/register")
+PAGES = (
+    "/",
+    "/about",
+    "/workers",
+    "/admin",
+    "/view_post/1",
+    "/check?name=a&surname=b",
+    "/people",
+    "/admin/slow_requests",
+    "/admin/edit_user/1",
+    "/admin/edit_post/1",
+)
+
+CHILD = """
+import json, statistics, sys, time
+from flask import before_render_template, template_rendered
+from factory import create_app
+
+requests = int(sys.argv[1])
+anonymous, pages = json.loads(sys.argv[2])
+app = create_app(json.loads(sys.argv[3]))
+app.extensions["page_cache"].max_bytes = 0
+loads, renders, started = {}, {}, {}
+loader = app.jinja_env.loader
+load = loader.load
+
+def timed_load(environment, name, globals=None):
+    begun = time.perf_counter()
+    try:
+        return load(environment, name, globals)
+    finally:
+        loads[name] = loads.get(name, 0) + time.perf_counter() - begun
+
+loader.load = timed_load
+
+@before_render_template.connect_via(app)
+def before(sender, template, context, **extra):
+    started[template.name] = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def after(sender, template, context, **extra):
+    duration = time.perf_counter() - started.pop(template.name)
+    renders.setdefault(template.name, []).append(duration)
+
+client = app.test_client()
+first_requests = {}
+
+def fetch(page):
+    begun = time.perf_counter()
+    client.get(page).get_data()
+    return time.perf_counter() - begun
+
+for index, page in enumerate(anonymous + pages):
+    if index == len(anonymous):
+        with client.session_transaction() as session:
+            session["username"] = "user0"
+    first_requests[page] = fetch(page)
+    for _ in range(requests):
+        fetch(page)
+print(json.dumps({
+    "loads": loads,
+    "first_render": {name: times[0] for name, times in renders.items()},
+    "steady_render": {
+        name: statistics.median(times[1:]) for name, times in renders.items()
+    },
+    "first_request": first_requests,
+}))
+"""
+
+
+def run_once(requests, config):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            CHILD,
+            str(requests),
+            json.dumps([ANONYMOUS_PAGES, PAGES]),
+            json.dumps(config),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def median_of(runs, key, name):
+    values = [run[key][name] for run in runs if name in run[key]]
+    return statistics.median(values) * 1000 if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=2000)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="blacklist-templates-")
+    path = os.path.join(work, "bench.db")
+    create_schema(path)
+    seed(path, max(10, args.posts // 20), args.posts)
+    config = {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SESSION_SQLITE_PATH": os.path.join(work, "sessions.db"),
+        "PHOTO_GC_INTERVAL": 0,
+    }
+    cache = os.path.join(work, "jinja_cache")
+    from factory import create_app
+
+    app = create_app({**config, "TEMPLATE_CACHE_FOLDER": cache})
+    print(app.test_cli_runner().invoke(args=["compile-templates"]).output.strip())
+
+    modes = {
+        "source": {**config, "TEMPLATE_CACHE_FOLDER": False},
+        "bytecode": {**config, "TEMPLATE_CACHE_FOLDER": cache},
+    }
+    results = {
+        mode: [run_once(args.requests, mode_config) for _ in range(args.runs)]
+        for mode, mode_config in modes.items()
+    }
+
+    names = sorted({name for run in results["source"] for name in run["loads"]})
+    print(f"{'template':<20} {'load ms':>17} {'first render ms':>19} {'steady ms':>9}")
+    print(f"{'':<20} {'source':>8} {'bytecode':>8} {'source':>9} {'bytecode':>9}")
+    for name in names:
+        print(
+            f"{name:<20}"
+            f" {median_of(results['source'], 'loads', name):8.2f}"
+            f" {median_of(results['bytecode'], 'loads', name):8.2f}"
+            f" {median_of(results['source'], 'first_render', name):9.2f}"
+            f" {median_of(results['bytecode'], 'first_render', name):9.2f}"
+            f" {median_of(results['bytecode'], 'steady_render', name):9.2f}"
+        )
+    print()
+    print(f"{'first request ms':<24} {'source':>8} {'bytecode':>8}")
+    for page in ANONYMOUS_PAGES + PAGES:
+        print(
+            f"{page:<24}"
+            f" {median_of(results['source'], 'first_request', page):8.2f}"
+            f" {median_of(results['bytecode'], 'first_request', page):8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename):
+    ext = os.path.splitext(filename)[1].lstrip(".").lower()
+    return "jsonl" if ext in ("jsonl", "ndjson", "json") else "csv"
+
+
+def read_records(stream, fmt):
+    """Yield `(line_number, record)` pairs from a CSV or JSONL text stream.
+
+    Rows are read one at a time. A JSONL line that is not a JSON object is
+    yielded as `(line_number, None)` so it can be reported as rejected.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield line_number, record if isinstance(record, dict) else None
+
+
+@dataclass
+class ImportStats:
+    imported: int = 0
+    rejected: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return (self.imported + self.rejected) / elapsed if elapsed else 0.0
+
+
+def import_records(records, validate, insert, batch_size, on_reject, on_progress=None):
+    """Validate `records` and hand the valid ones to `insert` in batches.
+
+    `validate(record)` returns `(values, errors)`; rows with errors go to
+    `on_reject(line_number, record, errors)`. `insert(batch)` must write
+    and commit one batch. Only one batch is held in memory at a time.
+    """
+    stats = ImportStats()
+    batch = []
+    for line_number, record in records:
+        if record is None:
+            values, errors = None, {"row": ["not a JSON object"]}
+        else:
+            values, errors = validate(record)
+        if errors:
+            stats.rejected += 1
+            on_reject(line_number, record, errors)
+            continue
+        batch.append(values)
+        if len(batch) >= batch_size:
+            insert(batch)
+            stats.imported += len(batch)
+            batch = []
+            if on_progress:
+                on_progress(stats)
+    if batch:
+        insert(batch)
+        stats.imported += len(batch)
+        if on_progress:
+            on_progress(stats)
+    return stats
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+
+CachedPage = namedtuple("CachedPage", "body mimetype etag created")
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire `ttl` seconds after being set.
+
+    At most `maxsize` entries are kept; the least recently used go first.
+    """
+
+    def __init__(self, ttl, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class PageCache:
+    """Rendered GET responses keyed by route, arguments and a data version.
+
+    Every committed write bumps `version`, so entries rendered from older
+    data are never served again and age out of the LRU, which is bounded
+    by the total size of the cached bodies (`max_bytes`). With several
+    worker processes, each bump also stamps the file at `stamp_path`,
+    which is part of every key, so one worker's writes retire the pages
+    the others have cached.
+    """
+
+    def __init__(self, max_bytes, ttl, stamp_path=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stamp_path = stamp_path
+        self.version = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+        if self.stamp_path is not None:
+            # time_ns() rather than the file system's coarser clock, so
+            # that two quick writes never leave the same stamp.
+            now = time.time_ns()
+            with open(self.stamp_path, "a"):
+                os.utime(self.stamp_path, ns=(now, now))
+
+    def data_version(self):
+        """`version`, and with a `stamp_path` the last write of any process."""
+        if self.stamp_path is None:
+            return self.version
+        try:
+            return self.version, os.stat(self.stamp_path).st_mtime_ns
+        except FileNotFoundError:
+            return self.version, 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.created + self.ttl < time.monotonic():
+                del self._entries[key]
+                self._bytes -= len(entry.body)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+
+    def cached(self, vary):
+        """Serve a GET view from the cache, with a strong ETag and 304s.
+
+        `vary()` returns the session values the page depends on, or None
+        when the page must not be cached for this request. Requests with
+        pending flash messages always render fresh.
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def decorated_function(*args, **kwargs):
+                return self.serve(view, vary, args, kwargs)
+
+            return decorated_function
+
+        return decorator
+
+    def serve(self, view, vary, args, kwargs):
+        """Respond to the current request with `view`, cached as in cached()."""
+        if request.method != "GET" or "_flashes" in session:
+            return view(*args, **kwargs)
+        varies = vary()
+        if varies is None:
+            return view(*args, **kwargs)
+        key = (
+            request.endpoint,
+            tuple(sorted(request.view_args.items())),
+            tuple(sorted(request.args.items(multi=True))),
+            self.data_version(),
+            varies,
+        )
+        entry = self.get(key)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if response.is_streamed:
+                # Cached once the last chunk has gone out; the ETag of a
+                # body that has not been rendered yet is unknown.
+                response.response = self._tee(
+                    key, response.response, response.mimetype
+                )
+                response.headers["Cache-Control"] = "private, no-cache"
+                response.vary.add("Cookie")
+                return response
+            entry = self._store(key, response.get_data(), response.mimetype)
+        else:
+            response = current_app.response_class(
+                entry.body, mimetype=entry.mimetype
+            )
+        response.set_etag(entry.etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Cookie")
+        return response.make_conditional(request)
+
+    def _store(self, key, body, mimetype):
+        entry = CachedPage(
+            body,
+            mimetype,
+            hashlib.blake2b(body, digest_size=16).hexdigest(),
+            time.monotonic(),
+        )
+        self.set(key, entry)
+        return entry
+
+    def _tee(self, key, body, mimetype):
+        """Yield the streamed `body` and cache it if it is sent in full."""
+        chunks = []
+        try:
+            for chunk in body:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                chunks.append(chunk)
+                yield chunk
+            self._store(key, b"".join(chunks), mimetype)
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
+
+
+def cached(vary):
+    """PageCache.cached() with the current app's page cache.
+
+    For views declared before any app exists; create_app() puts the
+    PageCache in `app.extensions["page_cache"]`.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            page_cache = current_app.extensions["page_cache"]
+            return page_cache.serve(view, vary, args, kwargs)
+
+        return decorated_function
+
+    return decorator
@@ -1,5 +1,72 @@
+from sqlite_profile import PRODUCTION_PRAGMAS
+
 navigation_items = [
     {"label": "მთავარი", "url": "/"},
     {"label": "ჩვენ შესახებ", "url": "/about"},
     {"label": "ხელოსნები", "url": "/workers"},
+    {"label": "შემოწმება", "url": "/check"},
+    {"label": "ხშირად ნახსენები", "url": "/people"},
 ]
+
+
+class Config:
+    """Defaults for create_app(); pass a mapping to override any of them.
+
+    DATABASE_URL and SESSION_SQLITE_PATH in the environment override the
+    database and the session store (e.g. for benchmarks).
+    """
+
+    SECRET_KEY = "supersecretkey"  # Set a secret key for session management
+    SQLALCHEMY_DATABASE_URI = "sqlite:///blackList.db"
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {"pool_size": 5, "max_overflow": 10}
+    # Read-only pool used for the SELECTs of GET requests (see RoutingSession);
+    # it opens SQLALCHEMY_DATABASE_URI unless SQLALCHEMY_BINDS is given.
+    READONLY_ENGINE_OPTIONS = {"pool_size": 10, "max_overflow": 20}
+    SQLITE_PRAGMAS = PRODUCTION_PRAGMAS  # {} for SQLite's defaults
+    SQLITE_WRITE_LOCK = True  # One writer at a time across workers (WriteLock)
+    SESSION_SQLITE_PATH = None  # Default: sessions.db in the instance folder
+    SESSION_CACHE_SIZE = 1024  # Encoded sessions cached per process
+    SESSION_CACHE_TTL = 5  # Seconds a cached session is trusted
+    SESSION_SWEEP_INTERVAL = 300  # Seconds between expiry sweeps
+    PAGE_SIZE = 50  # Rows per page on the listing pages
+    API_MAX_PAGE_SIZE = 200  # Largest ?limit= the API accepts
+    SQL_STATEMENT_LIMIT = 10  # Per-request cap, enforced when TESTING
+    PRINCIPAL_CACHE_TTL = 30  # Seconds a looked-up user is reused
+    PAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Rendered page budget
+    PAGE_CACHE_TTL = 300  # Below WTF_CSRF_TIME_LIMIT for cached forms
+    SLOW_REQUEST_THRESHOLD = 1.0  # Seconds before a request is logged
+    SLOW_REQUEST_LOG_SIZE = 50  # Slow requests kept for /admin
+    ASSETS_FOLDER = "dist"  # Under static/, written by `flask build-assets`
+    ASSETS_MAX_AGE = 365 * 24 * 3600  # Seconds fingerprinted files are cached
+    # Compiled templates shared by the workers; None = jinja_cache in the
+    # instance folder, False = no bytecode cache
+    TEMPLATE_CACHE_FOLDER = None
+    TEMPLATES_AUTO_RELOAD = None  # Re-read changed templates only in debug mode
+    STREAM_TEMPLATES = True  # Send the listing pages as they render
+    COMPRESS_RESPONSES = True  # False when a proxy in front compresses
+    COMPRESS_MIMETYPES = ("text/html", "application/json")
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller responses are sent as they are
+    COMPRESS_LEVEL = 6  # gzip, 1-9
+    COMPRESS_BROTLI_QUALITY = 4  # 0-11; higher costs much more CPU per chunk
+    # Set the folder to save uploaded files
+    UPLOAD_FOLDER = "static/uploads"
+    IMAGE_WORKERS = 2  # Processes generating photo variants
+    PHOTO_GC_INTERVAL = 3600  # Seconds between collections, 0 = off
+    PHOTO_GC_BATCH_SIZE = 200  # Photos checked per query
+    PHOTO_GC_PAUSE = 0.1  # Seconds slept between batches
+    PHOTO_GC_GRACE = 3600  # Files younger than this are kept
+    PERSON_CANDIDATES = 30  # Closest names/surnames considered
+    PERSON_MIN_SIMILARITY = 0.3  # Trigram similarity cut-off
+    HASH_WORKERS = 2  # Processes hashing passwords
+    HASH_MAX_PENDING = 8  # Hashes running or queued before 503s
+    HASH_TIMEOUT = 10  # Seconds a request waits for its hash
+    GROUP_COMMIT = False  # Commit new posts in batches from one writer thread
+    GROUP_COMMIT_MAX_BATCH = 64  # Posts per transaction
+    GROUP_COMMIT_DELAY = 0.002  # Seconds the writer waits to fill a batch
+    GROUP_COMMIT_MAX_PENDING = 1024  # Queued posts before 503s
+    GROUP_COMMIT_TIMEOUT = 10  # Seconds a post may wait in the queue
+    LOGIN_IP_LIMIT = 20  # Login/register attempts per IP...
+    LOGIN_IP_WINDOW = 60  # ...per this many seconds
+    LOGIN_USERNAME_LIMIT = 5  # Failed logins per username...
+    LOGIN_USERNAME_WINDOW = 300  # ...per this many seconds
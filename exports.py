@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+EXPORT_FORMATS = ("csv", "jsonl")
+MIMETYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+CHUNK_ROWS = 500
+
+
+def stream_rows(engine, statement, chunk_rows=CHUNK_ROWS):
+    """Yield lists of up to `chunk_rows` rows from a server-side cursor.
+
+    The connection is held only while the generator runs and is returned
+    to the pool when it is exhausted or closed, e.g. by the WSGI server
+    after the client disconnects.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, yield_per=chunk_rows
+        ).execute(statement)
+        for partition in result.partitions():
+            yield partition
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def serialize_rows(columns, chunks, fmt):
+    """Encode chunks of rows as UTF-8 CSV (with a header) or JSON lines."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(map(_plain, row) for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
+        return
+    for rows in chunks:
+        yield "".join(
+            json.dumps(
+                dict(zip(columns, map(_plain, row))), ensure_ascii=False
+            )
+            + "\n"
+            for row in rows
+        ).encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into one gzip member as it goes.
+
+    Each chunk is sync-flushed so the client receives data as soon as it
+    is produced instead of when the compressor's window fills up.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
@@ -0,0 +1,52 @@
+import click
+from flask import current_app
+from flask.cli import ScriptInfo
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.local import LocalProxy
+
+from search import include_object
+from sqlite_profile import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def _extension(name):
+    return LocalProxy(lambda: current_app.extensions[name])
+
+
+# Per-app objects, set up by create_app() and its init_* helpers.
+page_cache = _extension("page_cache")
+principal_cache = _extension("principal_cache")
+metrics = _extension("metrics")
+variant_pool = _extension("variant_pool")
+photo_collector = _extension("photo_collector")
+hash_pool = _extension("hash_pool")
+ip_throttle = _extension("ip_throttle")
+username_throttle = _extension("username_throttle")
+post_writer = _extension("post_writer")  # Only with GROUP_COMMIT
+
+
+class LazyMigrateGroup(click.Group):
+    """`flask db`, importing Flask-Migrate (and Alembic) on first use.
+
+    Web workers never run migrations, so they skip the import; the CLI
+    sets the extension up the moment a `db` subcommand is looked up.
+    """
+
+    def _migrate_group(self, ctx):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as migrate_group
+
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if "migrate" not in app.extensions:
+            Migrate(app, db, include_object=include_object)
+        return migrate_group
+
+    def list_commands(self, ctx):
+        return self._migrate_group(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._migrate_group(ctx).get_command(ctx, name)
+
+
+migrate_command = LazyMigrateGroup("db", help="Perform database migrations.")
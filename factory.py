@@ -0,0 +1,91 @@
+import os
+
+from flask import Flask
+
+import admin
+import api
+import auth
+import lookup
+import photos
+import posts
+from assets import init_assets
+from cache import PageCache
+from config import Config
+from extensions import db, migrate_command
+from group_commit import init_group_commit
+from metrics import init_metrics
+from pagination import url_for_page
+from query_guard import init_query_guard
+from server import serve_command
+from sessions import SQLiteSessionInterface
+from sqlite_profile import database_file, init_sqlite_profile
+from streaming import CompressionMiddleware
+from templating import init_templates
+
+
+def create_app(config=None):
+    """Build the application: Config, then the environment, then `config`.
+
+    Nothing slow happens here: worker pools spawn on first use, the photo
+    collector starts with the first request and Flask-Migrate is only
+    imported by the `flask db` commands.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    # DATABASE_URL and SESSION_SQLITE_PATH override the defaults, e.g. for benchmarks
+    if "DATABASE_URL" in os.environ:
+        app.config["SQLALCHEMY_DATABASE_URI"] = os.environ["DATABASE_URL"]
+    if "SESSION_SQLITE_PATH" in os.environ:
+        app.config["SESSION_SQLITE_PATH"] = os.environ["SESSION_SQLITE_PATH"]
+    app.config.from_mapping(config or {})
+    app.config.setdefault(
+        "SQLALCHEMY_BINDS",
+        {
+            "readonly": {
+                "url": app.config["SQLALCHEMY_DATABASE_URI"],
+                **app.config["READONLY_ENGINE_OPTIONS"],
+            }
+        },
+    )
+    if app.config["SESSION_SQLITE_PATH"] is None:
+        app.config["SESSION_SQLITE_PATH"] = os.path.join(
+            app.instance_path, "sessions.db"
+        )
+
+    app.session_interface = SQLiteSessionInterface(
+        app,
+        app.config["SESSION_SQLITE_PATH"],
+        cache_size=app.config["SESSION_CACHE_SIZE"],
+        cache_ttl=app.config["SESSION_CACHE_TTL"],
+        sweep_interval=app.config["SESSION_SWEEP_INTERVAL"],
+    )
+    db.init_app(app)
+    init_sqlite_profile(app, db)
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(serve_command)
+    init_templates(app)
+    app.jinja_env.globals["url_for_page"] = url_for_page
+    init_assets(app)
+    init_query_guard(app)
+    init_metrics(app)
+    with app.app_context():
+        database = database_file(db.engine)
+    app.extensions["page_cache"] = PageCache(
+        app.config["PAGE_CACHE_MAX_BYTES"],
+        app.config["PAGE_CACHE_TTL"],
+        stamp_path=f"{database}-version" if database else None,
+    )
+    auth.init_auth(app)
+    photos.init_photos(app)
+    init_group_commit(app)
+    for module in (auth, posts, lookup, admin, photos, api):
+        app.register_blueprint(module.bp)
+    if app.config["COMPRESS_RESPONSES"]:
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            mimetypes=app.config["COMPRESS_MIMETYPES"],
+            min_size=app.config["COMPRESS_MIN_SIZE"],
+            level=app.config["COMPRESS_LEVEL"],
+            brotli_quality=app.config["COMPRESS_BROTLI_QUALITY"],
+        )
+    return app
@@ -0,0 +1,60 @@
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed
+from wtforms import StringField, PasswordField, SubmitField, TextAreaField
+from wtforms.validators import DataRequired, EqualTo
+
+PHOTO_EXTENSIONS = ["jpg", "png", "jpeg"]
+
+
+class PostForm(FlaskForm):
+    name = StringField("სახელი", validators=[DataRequired()])
+    surname = StringField("გვარი", validators=[DataRequired()])
+    title = StringField("სათაური", validators=[DataRequired()])
+    content = TextAreaField("აღწერა", validators=[DataRequired()])
+    photo = FileField("ფოტო", validators=[FileAllowed(PHOTO_EXTENSIONS)])
+    submit = SubmitField("დამატება")
+
+
+class CheckPersonForm(FlaskForm):
+    class Meta:
+        csrf = False  # A GET search form
+
+    name = StringField("სახელი")
+    surname = StringField("გვარი", validators=[DataRequired()])
+    submit = SubmitField("შემოწმება")
+
+
+class EditUserForm(FlaskForm):
+    name = StringField("სახელი", validators=[DataRequired()])
+    surname = StringField("გვარი", validators=[DataRequired()])
+    username = StringField("მომხმარებლის სახელი", validators=[DataRequired()])
+    submit = SubmitField("განახლება")
+
+
+class EditPostForm(FlaskForm):
+    name = StringField("სახელი", validators=[DataRequired()])
+    surname = StringField("გვარი", validators=[DataRequired()])
+    title = StringField("სათაური", validators=[DataRequired()])
+    content = TextAreaField("აღწერა", validators=[DataRequired()])
+    submit = SubmitField("რედაქტირება")
+
+
+class LoginForm(FlaskForm):
+    username = StringField("მომხმარებლის სახელი", validators=[DataRequired()])
+    password = PasswordField("პაროლი", validators=[DataRequired()])
+    submit = SubmitField("შესვლა")
+
+
+class RegisterForm(FlaskForm):
+    name = StringField("სახელი", validators=[DataRequired()])
+    surname = StringField("გვარი", validators=[DataRequired()])
+    username = StringField("მომხმარებლის სახელი", validators=[DataRequired()])
+    password = PasswordField("პაროლი", validators=[DataRequired()])
+    confirm_password = PasswordField(
+        "დაადასტურეთ პაროლი",
+        validators=[
+            DataRequired(),
+            EqualTo("password", message="Passwords must match"),
+        ],
+    )
+    submit = SubmitField("რეგისტრაცია")
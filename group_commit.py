@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from extensions import db
+
+
+class WriterBusy(Exception):
+    """The write queue is full, or the insert was still queued at its timeout."""
+
+
+class GroupCommitWriter:
+    """Commits the inserts of concurrent requests together from one thread.
+
+    insert() queues a new model instance and blocks until the writer
+    thread has committed it. The writer takes whatever is queued (up to
+    `max_batch` rows, waiting at most `max_delay` seconds for more after
+    the first) and inserts it in one transaction, so a burst pays for one
+    write lock and one WAL sync instead of one per post. When a batch
+    fails, its rows are retried one transaction each, so only the request
+    whose row is at fault sees the error.
+
+    At most `max_pending` inserts wait at a time; beyond that insert()
+    raises WriterBusy straight away. The thread starts with the first
+    insert of each process, so forked workers get their own.
+    """
+
+    def __init__(self, app, max_batch=64, max_delay=0.002, max_pending=1024):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._queue = None
+        self._writer_pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._queue = queue.Queue(self.max_pending)
+            self._writer_pid = os.getpid()
+            threading.Thread(
+                target=self._write_forever, name="group-commit", daemon=True
+            ).start()
+
+    def insert(self, row, timeout=None):
+        """Insert the transient instance `row`; return its primary key.
+
+        Raises what the insert raised, or WriterBusy if the queue is full
+        or the row has not been picked up within `timeout` seconds. Once
+        picked up, its outcome is always waited for, so a request never
+        reports a failure for a row that was committed.
+        """
+        if self._writer_pid != os.getpid():
+            self._start()
+        future = Future()
+        try:
+            self._queue.put_nowait((row, future))
+        except queue.Full:
+            raise WriterBusy() from None
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            if future.cancel():
+                raise WriterBusy() from None
+            return future.result()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return [
+            (row, future)
+            for row, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+
+    def _write_forever(self):
+        with self.app.app_context():
+            while True:
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                try:
+                    self._commit(batch)
+                except Exception:
+                    # One transaction per row: only the faulty ones fail.
+                    for row, future in batch:
+                        try:
+                            self._commit([(row, future)])
+                        except Exception as error:
+                            future.set_exception(error)
+                finally:
+                    db.session.remove()
+
+    def _commit(self, batch):
+        try:
+            db.session.add_all([row for row, _ in batch])
+            db.session.flush()
+            keys = [row.id for row, _ in batch]
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for (_, future), key in zip(batch, keys):
+            future.set_result(key)
+
+
+def init_group_commit(app):
+    """Queue post inserts to a GroupCommitWriter when GROUP_COMMIT is on."""
+    if app.config["GROUP_COMMIT"]:
+        app.extensions["post_writer"] = GroupCommitWriter(
+            app,
+            max_batch=app.config["GROUP_COMMIT_MAX_BATCH"],
+            max_delay=app.config["GROUP_COMMIT_DELAY"],
+            max_pending=app.config["GROUP_COMMIT_MAX_PENDING"],
+        )
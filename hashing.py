@@ -0,0 +1,87 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashPoolBusy(Exception):
+    """The hashing pool is saturated: the queue is full or a hash timed out."""
+
+
+class HashPool:
+    """Password hashing on worker processes, with a bounded queue.
+
+    Hashing is deliberately slow, and done on a request thread it holds
+    that thread and the GIL-bound process's CPU for its whole duration.
+    Here at most `max_pending` hashes are running or queued at a time;
+    further calls raise HashPoolBusy straight away so the caller can shed
+    load instead of piling up threads. Workers are spawned, like
+    VariantPool's, so they inherit nothing from the web process. A worker
+    that dies (OOM kill, crash) breaks the whole executor; it is replaced
+    and the hash retried once.
+    """
+
+    def __init__(self, max_workers, max_pending):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _submit(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashPoolBusy()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                executor = self._executor
+            future = executor.submit(function, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._replace(executor)
+            raise
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda future: self._slots.release())
+        return executor, future
+
+    def _replace(self, broken):
+        """Drop the `broken` executor; the next submit starts a new one."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False)
+
+    def _run(self, timeout, function, *args):
+        for _ in range(2):
+            executor = None
+            try:
+                executor, future = self._submit(function, *args)
+                return future.result(timeout)
+            except FutureTimeout:
+                raise HashPoolBusy() from None
+            except BrokenProcessPool:
+                # When submit() raises it, it has replaced the executor.
+                if executor is not None:
+                    self._replace(executor)
+        raise HashPoolBusy()
+
+    def check(self, pwhash, password, timeout=None):
+        return self._run(timeout, check_password_hash, pwhash, password)
+
+    def generate(self, password, timeout=None):
+        return self._run(timeout, generate_password_hash, password)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
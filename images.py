@@ -0,0 +1,134 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Longest edge, in pixels, of each variant generated for an uploaded photo.
+VARIANTS = {"thumbnail": 200, "medium": 800}
+JPEG_QUALITY = 80
+
+logger = logging.getLogger(__name__)
+
+
+def variant_name(filename, variant):
+    return f"{os.path.splitext(filename)[0]}_{variant}.jpg"
+
+
+def make_variants(upload_folder, filename):
+    """Write the resized variants of `filename` next to it.
+
+    Runs in a worker process. Images are rotated according to their EXIF
+    orientation and re-encoded as progressive JPEG without any metadata.
+    Returns a {variant: filename} dict relative to `upload_folder`.
+    """
+    # Only the worker processes need Pillow; the web process never loads it.
+    from PIL import Image, ImageOps
+
+    created = {}
+    with Image.open(os.path.join(upload_folder, filename)) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        name = variant_name(filename, variant)
+        resized.save(
+            os.path.join(upload_folder, name),
+            "JPEG",
+            quality=JPEG_QUALITY,
+            optimize=True,
+            progressive=True,
+        )
+        created[variant] = name
+    return created
+
+
+class VariantPool:
+    """Process pool that turns uploads into variants off the request thread.
+
+    Workers are spawned rather than forked so they never inherit the web
+    process's threads, sockets or database connections. If a worker dies
+    (OOM kill, crash), the broken executor is replaced on the next submit.
+
+    `on_done` callbacks run one at a time on a thread of their own, not
+    on the executor's result thread: they write to the database, and one
+    waiting for the write lock must not hold up the other jobs' results.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._results = None
+        self._results_thread = None
+        self._results_pid = None
+        self._results_lock = threading.Lock()
+
+    def _current(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _replace(self, broken):
+        """Drop the `broken` executor; the next submit starts a new one."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False)
+
+    def _result_queue(self):
+        with self._results_lock:
+            if self._results_pid != os.getpid():
+                self._results = queue.Queue()
+                self._results_thread = threading.Thread(
+                    target=self._deliver_forever,
+                    args=(self._results,),
+                    name="photo-variants",
+                    daemon=True,
+                )
+                self._results_thread.start()
+                self._results_pid = os.getpid()
+            return self._results
+
+    @staticmethod
+    def _deliver_forever(results):
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            future, on_done = item
+            try:
+                on_done(future)
+            except Exception:
+                logger.exception("Photo variant callback failed")
+
+    def submit(self, upload_folder, filename, on_done):
+        executor = self._current()
+        try:
+            future = executor.submit(make_variants, upload_folder, filename)
+        except BrokenProcessPool:
+            self._replace(executor)
+            future = self._current().submit(make_variants, upload_folder, filename)
+        results = self._result_queue()
+        future.add_done_callback(lambda future: results.put((future, on_done)))
+        return future
+
+    def shutdown(self, wait=True):
+        """Stop the workers; with `wait`, also run the pending callbacks."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        with self._results_lock:
+            if self._results_pid != os.getpid():
+                return
+            self._results.put(None)
+            if wait:
+                self._results_thread.join()
+            self._results_pid = None
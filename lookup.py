@@ -0,0 +1,191 @@
+import math
+from dataclasses import dataclass
+
+import click
+from flask import Blueprint, current_app, render_template, request
+from sqlalchemy.orm import joinedload
+
+from auth import login_required, viewer
+from cache import cached
+from config import navigation_items
+from extensions import db
+from forms import CheckPersonForm
+from models import People, Posts, name_trigrams
+from names import normalize_name, similarity, trigrams
+from pagination import keyset_page
+from people import rebuild_people
+
+bp = Blueprint("lookup", __name__, cli_group=None)
+
+
+@dataclass
+class PersonMatch:
+    name: str
+    surname: str
+    posts: int
+    latest_post_id: int
+    score: float
+    surname_key: str
+    name_key: str
+
+
+def similar_name_keys(key):
+    """{name_key: similarity} of the indexed names closest to `key`."""
+    query_trigrams = trigrams(key)
+    if not query_trigrams:
+        return {}
+    min_similarity = current_app.config["PERSON_MIN_SIMILARITY"]
+    # similarity >= t needs at least t * len(query_trigrams) shared trigrams,
+    # which skips most keys that only share a common ending like "dze".
+    min_shared = math.ceil(min_similarity * len(query_trigrams))
+    shared = db.session.execute(
+        db.select(name_trigrams.c.name_key, db.func.count())
+        .where(name_trigrams.c.trigram.in_(query_trigrams))
+        .group_by(name_trigrams.c.name_key)
+        .having(db.func.count() >= min_shared)
+    ).all()
+    scores = {
+        name_key: similarity(query_trigrams, name_key, count)
+        for name_key, count in shared
+    }
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return {
+        name_key: score
+        for name_key, score in best[: current_app.config["PERSON_CANDIDATES"]]
+        if score >= min_similarity
+    }
+
+
+def find_people(name, surname, limit=20):
+    """People in posts whose name and surname resemble the given ones.
+
+    Both sides are normalized (case, Mtavruli, Georgian/Cyrillic/Latin) and
+    compared by trigram similarity, so misspellings and transliterations
+    still match. Only the closest indexed keys are looked up, by primary
+    key in the people summary, so the cost does not grow with the table.
+    """
+    surnames = similar_name_keys(normalize_name(surname))
+    if not surnames:
+        return []
+    statement = db.select(
+        People.name,
+        People.surname,
+        People.reports,
+        People.latest_post_id,
+        People.surname_key,
+        People.name_key,
+    ).where(People.surname_key.in_(surnames))
+    names = None
+    if normalize_name(name):
+        names = similar_name_keys(normalize_name(name))
+        if not names:
+            return []
+        statement = statement.where(People.name_key.in_(names))
+
+    people = []
+    for row in db.session.execute(statement):
+        score = surnames[row.surname_key]
+        if names is not None:
+            score = 0.6 * score + 0.4 * names[row.name_key]
+        people.append(
+            PersonMatch(
+                row.name,
+                row.surname,
+                row.reports,
+                row.latest_post_id,
+                score,
+                row.surname_key,
+                row.name_key,
+            )
+        )
+    people.sort(key=lambda person: (person.score, person.posts), reverse=True)
+    return people[:limit]
+
+
+@bp.route("/check")
+@login_required
+@cached(viewer)
+def check_person():
+    form = CheckPersonForm(request.args)
+    people = None
+    if request.args and form.validate():
+        people = find_people(form.name.data, form.surname.data)
+    return render_template(
+        "check.html", form=form, people=people, navigation_items=navigation_items
+    )
+
+
+# Keyset orders of /people; the last keys make each order unique.
+PEOPLE_ORDERS = {
+    "reports": [
+        (People.reports, True),
+        (People.surname_key, True),
+        (People.name_key, True),
+    ],
+    "last_reported": [
+        (People.last_reported, True),
+        (People.surname_key, True),
+        (People.name_key, True),
+    ],
+    "surname": [(People.surname_key, False), (People.name_key, False)],
+}
+
+
+@bp.route("/people")
+@login_required
+@cached(viewer)
+def most_reported():
+    order_by = request.args.get("order_by")
+    if order_by not in PEOPLE_ORDERS:
+        order_by = "reports"
+    page = keyset_page(
+        People.query,
+        PEOPLE_ORDERS[order_by],
+        current_app.config["PAGE_SIZE"],
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+    return render_template(
+        "people.html",
+        people=page.items,
+        page=page,
+        order_by=order_by,
+        navigation_items=navigation_items,
+    )
+
+
+@bp.route("/person")
+@login_required
+@cached(viewer)
+def person():
+    surname_key = request.args.get("surname", "")
+    name_key = request.args.get("name", "")
+    summary = People.query.get_or_404((surname_key, name_key))
+    page = keyset_page(
+        Posts.query.options(joinedload(Posts.author)).filter_by(
+            surname_key=surname_key, name_key=name_key
+        ),
+        [(Posts.date, True), (Posts.id, True)],
+        current_app.config["PAGE_SIZE"],
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+    return render_template(
+        "person.html",
+        person=summary,
+        posts=page.items,
+        page=page,
+        navigation_items=navigation_items,
+    )
+
+
+@bp.cli.command("rebuild-people")
+def rebuild_people_command():
+    """Recompute the people summary from posts.
+
+    The triggers keep it current; this is for repairs, e.g. after posts
+    were changed with the triggers missing.
+    """
+    rebuild_people(db.session.connection())
+    db.session.commit()
+    click.echo(f"Summarized {People.query.count()} people")
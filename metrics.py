@@ -0,0 +1,273 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from flask import (
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds, in seconds, of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+MAX_RECORDED_STATEMENTS = 100  # Per request, for the slow-request log
+
+slow_log = logging.getLogger("blacklist.slow_requests")
+
+
+class EndpointStats:
+    __slots__ = (
+        "requests",
+        "buckets",
+        "duration",
+        "sql_queries",
+        "sql_duration",
+        "render_duration",
+        "upload_bytes",
+        "slow_requests",
+    )
+
+    def __init__(self):
+        self.requests = {}  # status code -> count
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.duration = 0.0
+        self.sql_queries = 0
+        self.sql_duration = 0.0
+        self.render_duration = 0.0
+        self.upload_bytes = 0
+        self.slow_requests = 0
+
+
+class RequestMetrics:
+    """Per-endpoint counters for one process, rendered for Prometheus.
+
+    Each request only adds a handful of `perf_counter()` calls and one
+    locked dict update, so it is cheap enough to leave on in production.
+    """
+
+    def __init__(self, slow_threshold=1.0, slow_log_size=50):
+        self.slow_threshold = slow_threshold
+        self.slow_requests = deque(maxlen=slow_log_size)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        endpoint,
+        status,
+        duration,
+        sql_queries,
+        sql_duration,
+        render_duration,
+        upload_bytes,
+        slow,
+    ):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.requests[status] = stats.requests.get(status, 0) + 1
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+            stats.duration += duration
+            stats.sql_queries += sql_queries
+            stats.sql_duration += sql_duration
+            stats.render_duration += render_duration
+            stats.upload_bytes += upload_bytes
+            stats.slow_requests += slow
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format.
+
+        Every sample is labelled with this process's pid: under `flask
+        serve` each worker keeps its own counters, and whichever worker
+        answers a scrape reports only those.
+        """
+        worker = os.getpid()
+        with self._lock:
+            snapshot = [
+                (
+                    f'worker="{worker}",endpoint="{endpoint}"',
+                    stats,
+                    dict(stats.requests),
+                    list(stats.buckets),
+                )
+                for endpoint, stats in sorted(self._endpoints.items())
+            ]
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        metric(
+            "blacklist_http_requests_total",
+            "counter",
+            "Requests handled, by endpoint and status code.",
+            [
+                f'blacklist_http_requests_total{{{labels},'
+                f'status="{status}"}} {count}'
+                for labels, _, requests, _ in snapshot
+                for status, count in sorted(requests.items())
+            ],
+        )
+        histogram = []
+        for labels, stats, requests, buckets in snapshot:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += count
+                histogram.append(
+                    f"blacklist_http_request_duration_seconds_bucket"
+                    f'{{{labels},le="{bound}"}} {cumulative}'
+                )
+            histogram.append(
+                f"blacklist_http_request_duration_seconds_sum"
+                f'{{{labels}}} {stats.duration:.6f}'
+            )
+            histogram.append(
+                f"blacklist_http_request_duration_seconds_count"
+                f'{{{labels}}} {cumulative}'
+            )
+        metric(
+            "blacklist_http_request_duration_seconds",
+            "histogram",
+            "Time spent handling requests.",
+            histogram,
+        )
+        for name, attribute, help_text in (
+            ("blacklist_sql_queries_total", "sql_queries", "SQL statements executed."),
+            (
+                "blacklist_sql_duration_seconds_total",
+                "sql_duration",
+                "Time spent executing SQL statements.",
+            ),
+            (
+                "blacklist_template_render_seconds_total",
+                "render_duration",
+                "Time spent rendering templates.",
+            ),
+            ("blacklist_upload_bytes_total", "upload_bytes", "Bytes of uploaded forms."),
+            (
+                "blacklist_slow_requests_total",
+                "slow_requests",
+                "Requests slower than SLOW_REQUEST_THRESHOLD.",
+            ),
+        ):
+            metric(
+                name,
+                "counter",
+                help_text,
+                [
+                    f'{name}{{{labels}}} {getattr(stats, attribute):g}'
+                    for labels, stats, _, _ in snapshot
+                ],
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "metrics_started" in g:
+        g.sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "sql_started" in g:
+        duration = time.perf_counter() - g.pop("sql_started")
+        g.sql_duration += duration
+        g.sql_queries += 1
+        if len(g.sql_log) < MAX_RECORDED_STATEMENTS:
+            g.sql_log.append((duration, statement))
+
+
+def init_metrics(app):
+    """Record request, SQL and template timings into `app.extensions["metrics"]`.
+
+    Requests slower than SLOW_REQUEST_THRESHOLD seconds are logged to the
+    `blacklist.slow_requests` logger with their SQL statements and kept in
+    `metrics.slow_requests` for the admin pages.
+    """
+    metrics = RequestMetrics(
+        app.config["SLOW_REQUEST_THRESHOLD"], app.config["SLOW_REQUEST_LOG_SIZE"]
+    )
+    app.extensions["metrics"] = metrics
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_duration = 0.0
+        g.sql_log = []
+        g.render_duration = 0.0
+
+    @before_render_template.connect_via(app)
+    def start_render_timer(sender, template, context, **extra):
+        g.render_started = time.perf_counter()
+
+    @template_rendered.connect_via(app)
+    def stop_render_timer(sender, template, context, **extra):
+        if "render_started" in g:
+            g.render_duration += time.perf_counter() - g.pop("render_started")
+
+    @app.after_request
+    def remember_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record_request(exc):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        endpoint = request.endpoint or "unmatched"
+        status = g.get("response_status", 500)
+        upload_bytes = 0
+        if request.mimetype == "multipart/form-data":
+            upload_bytes = request.content_length or 0
+        slow = duration >= metrics.slow_threshold
+        metrics.record(
+            endpoint,
+            status,
+            duration,
+            g.sql_queries,
+            g.sql_duration,
+            g.render_duration,
+            upload_bytes,
+            slow,
+        )
+        if slow:
+            entry = {
+                "time": datetime.utcnow(),
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "endpoint": endpoint,
+                "status": status,
+                "duration": duration,
+                "sql_duration": g.sql_duration,
+                "statements": list(g.sql_log),
+            }
+            metrics.slow_requests.append(entry)
+            slow_log.warning(
+                "Slow request %s %s: %.3f s, %d SQL statements in %.3f s\n%s",
+                entry["method"],
+                entry["path"],
+                duration,
+                g.sql_queries,
+                g.sql_duration,
+                "\n".join(
+                    f"  {took * 1000:8.2f} ms  {' '.join(statement.split())}"
+                    for took, statement in entry["statements"]
+                ),
+            )
+
+    return metrics
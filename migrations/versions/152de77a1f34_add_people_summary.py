@@ -0,0 +1,59 @@
+"""Add people summary table
+
+Revision ID: 152de77a1f34
+Revises: 766b9a4b657e
+Create Date: 2026-10-18 21:10:22.816117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from people import PEOPLE_TRIGGERS, REBUILD_PEOPLE
+
+
+# revision identifiers, used by Alembic.
+revision = '152de77a1f34'
+down_revision = '766b9a4b657e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('people',
+    sa.Column('surname_key', sa.String(length=100), nullable=False),
+    sa.Column('name_key', sa.String(length=100), nullable=False),
+    sa.Column('name', sa.String(length=10), nullable=False),
+    sa.Column('surname', sa.String(length=30), nullable=False),
+    sa.Column('reports', sa.Integer(), nullable=False),
+    sa.Column('first_reported', sa.DateTime(), nullable=False),
+    sa.Column('last_reported', sa.DateTime(), nullable=False),
+    sa.Column('latest_post_id', sa.Integer(), nullable=False),
+    sa.Column('photo', sa.String(length=100), nullable=True),
+    sa.Column('thumbnail', sa.String(length=100), nullable=True),
+    sa.Column('medium', sa.String(length=100), nullable=True),
+    sa.PrimaryKeyConstraint('surname_key', 'name_key')
+    )
+    op.create_index('ix_people_last_reported', 'people', ['last_reported', 'surname_key', 'name_key'], unique=False)
+    op.create_index('ix_people_reports', 'people', ['reports', 'surname_key', 'name_key'], unique=False)
+
+    # Plain index DDL rather than a batch rebuild of posts, which would drop
+    # the posts_fts triggers (see 3cb53b68dfc3).
+    op.drop_index('ix_posts_person', table_name='posts')
+    op.create_index('ix_posts_person', 'posts', ['surname_key', 'name_key', 'date'], unique=False)
+
+    for trigger in PEOPLE_TRIGGERS:
+        op.execute(trigger)
+    # Backfill the summary from the posts that already exist.
+    for statement in REBUILD_PEOPLE:
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in ('people_au', 'people_ad', 'people_ai'):
+        op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.drop_index('ix_posts_person', table_name='posts')
+    op.create_index('ix_posts_person', 'posts', ['surname_key', 'name_key'], unique=False)
+
+    op.drop_index('ix_people_reports', table_name='people')
+    op.drop_index('ix_people_last_reported', table_name='people')
+    op.drop_table('people')
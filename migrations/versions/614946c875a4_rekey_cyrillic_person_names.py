@@ -0,0 +1,132 @@
+"""Rekey person names normalize_name used to drop (Cyrillic and other scripts)
+
+Revision ID: 614946c875a4
+Revises: 152de77a1f34
+Create Date: 2026-10-18 22:30:14.402761
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '614946c875a4'
+down_revision = '152de77a1f34'
+branch_labels = None
+depends_on = None
+
+# names.normalize_name and trigrams as of this revision, frozen so that the
+# keys written here never change with later versions of names.py.
+GEORGIAN_TO_LATIN = {
+    'ა': 'a', 'ბ': 'b', 'გ': 'g', 'დ': 'd', 'ე': 'e', 'ვ': 'v', 'ზ': 'z',
+    'თ': 't', 'ი': 'i', 'კ': 'k', 'ლ': 'l', 'მ': 'm', 'ნ': 'n', 'ო': 'o',
+    'პ': 'p', 'ჟ': 'zh', 'რ': 'r', 'ს': 's', 'ტ': 't', 'უ': 'u', 'ფ': 'p',
+    'ქ': 'k', 'ღ': 'gh', 'ყ': 'q', 'შ': 'sh', 'ჩ': 'ch', 'ც': 'ts', 'ძ': 'dz',
+    'წ': 'ts', 'ჭ': 'ch', 'ხ': 'kh', 'ჯ': 'j', 'ჰ': 'h',
+}
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ґ': 'g', 'д': 'd', 'е': 'e',
+    'є': 'ie', 'ж': 'zh', 'з': 'z', 'и': 'i', 'і': 'i', 'к': 'k', 'л': 'l',
+    'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'у': 'u', 'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh',
+    'щ': 'shch', 'ъ': '', 'ы': 'y', 'ь': '', 'э': 'e', 'ю': 'iu', 'я': 'ia',
+}
+LATIN_VARIANTS = [('dzh', 'j'), ('x', 'kh'), ('tz', 'ts'), ('w', 'v')]
+_NON_LETTERS_RE = re.compile(r'[^a-z]+')
+_TRANSLITERATE = str.maketrans({**GEORGIAN_TO_LATIN, **CYRILLIC_TO_LATIN})
+
+
+def normalize_name(text):
+    folded = unicodedata.normalize('NFKD', (text or '').casefold())
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    latin = folded.translate(_TRANSLITERATE)
+    for variant, standard in LATIN_VARIANTS:
+        latin = latin.replace(variant, standard)
+    return _NON_LETTERS_RE.sub('', latin) or ''.join(
+        c for c in folded if c.isalpha()
+    )
+
+
+def trigrams(key):
+    if not key:
+        return set()
+    padded = f'  {key} '
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    conn = op.get_bind()
+    posts = sa.table(
+        'posts',
+        sa.column('id'),
+        sa.column('name'),
+        sa.column('surname'),
+        sa.column('name_key'),
+        sa.column('surname_key'),
+    )
+    name_trigrams = sa.table(
+        'name_trigrams', sa.column('trigram'), sa.column('name_key')
+    )
+    rekey = (
+        posts.update()
+        .where(posts.c.id == sa.bindparam('post_id'))
+        .values(
+            name_key=sa.bindparam('name_key'),
+            surname_key=sa.bindparam('surname_key'),
+        )
+    )
+    # Walked by id in batches, so only one batch of posts is in memory.
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(
+                posts.c.id,
+                posts.c.name,
+                posts.c.surname,
+                posts.c.name_key,
+                posts.c.surname_key,
+            )
+            .where(posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        keys = set()
+        updates = []
+        for post_id, name, surname, old_name_key, old_surname_key in rows:
+            name_key, surname_key = normalize_name(name), normalize_name(surname)
+            if (name_key, surname_key) != (old_name_key, old_surname_key):
+                keys.update((name_key, surname_key))
+                updates.append(
+                    {
+                        'post_id': post_id,
+                        'name_key': name_key,
+                        'surname_key': surname_key,
+                    }
+                )
+        # The people_au trigger moves every rekeyed post to its new person.
+        if updates:
+            conn.execute(rekey, updates)
+        trigram_rows = [
+            {'trigram': trigram, 'name_key': key}
+            for key in keys
+            if key
+            for trigram in trigrams(key)
+        ]
+        if trigram_rows:
+            conn.execute(
+                name_trigrams.insert().prefix_with('OR IGNORE'), trigram_rows
+            )
+
+
+def downgrade():
+    # The new keys still find the same people; nothing to undo.
+    pass
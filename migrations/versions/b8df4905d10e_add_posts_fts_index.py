@@ -0,0 +1,57 @@
+"""Add posts_fts full-text index
+
+Revision ID: b8df4905d10e
+Revises: 464911749648
+Create Date: 2026-10-18 10:12:41.208315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8df4905d10e'
+down_revision = '464911749648'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        CREATE VIRTUAL TABLE posts_fts USING fts5(
+            name, surname, title, content,
+            content='posts', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, name, surname, title, content)
+            VALUES (new.id, new.name, new.surname, new.title, new.content);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, name, surname, title, content)
+            VALUES ('delete', old.id, old.name, old.surname, old.title, old.content);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER posts_fts_au
+        AFTER UPDATE OF name, surname, title, content ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, name, surname, title, content)
+            VALUES ('delete', old.id, old.name, old.surname, old.title, old.content);
+            INSERT INTO posts_fts(rowid, name, surname, title, content)
+            VALUES (new.id, new.name, new.surname, new.title, new.content);
+        END
+    """)
+    # Backfill the index from the rows that already exist.
+    op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS posts_fts_ai")
+    op.execute("DROP TABLE IF EXISTS posts_fts")
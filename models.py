@@ -0,0 +1,164 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from extensions import db, page_cache
+from names import normalize_name, trigrams
+from people import install_people_summary
+from search import install_posts_fts
+
+
+def normalized(source):
+    """Column default: normalize_name() of the `source` column's value."""
+
+    def default(context):
+        return normalize_name(context.get_current_parameters().get(source))
+
+    return default
+
+
+class Users(db.Model):
+    __tablename__ = "users"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(10), unique=False, nullable=False)
+    surname = db.Column(db.String(30), unique=False, nullable=False)
+    username = db.Column(db.String(30), unique=True, nullable=False)
+    password = db.Column(db.String(128), nullable=False)
+    is_admin = db.Column(db.Boolean, default=False, nullable=False)
+    posts = db.relationship("Posts", backref="author", lazy=True)
+
+    def __repr__(self):
+        return f"Users('{self.name}', '{self.surname}', '{self.username}')"
+
+
+class Posts(db.Model):
+    __tablename__ = "posts"
+    __table_args__ = (
+        db.Index("ix_posts_date_id", "date", "id"),  # listing order + keyset
+        db.Index("ix_posts_name_surname", "name", "surname"),
+        # /check and the people summary's per-person recomputes
+        db.Index("ix_posts_person", "surname_key", "name_key", "date"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(10), unique=False, nullable=False)
+    surname = db.Column(db.String(30), unique=False, nullable=False)
+    title = db.Column(db.String(100), unique=False, nullable=False)
+    content = db.Column(db.String(1000), unique=False, nullable=False)
+    photo = db.Column(db.String(100), nullable=True, index=True)  # New column for photo
+    thumbnail = db.Column(db.String(100), nullable=True)  # Resized variants,
+    medium = db.Column(db.String(100), nullable=True)  # set once generated
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), nullable=False, index=True
+    )
+    date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # normalize_name() of name/surname, kept in sync on every write
+    name_key = db.Column(db.String(100), default=normalized("name"))
+    surname_key = db.Column(db.String(100), default=normalized("surname"))
+
+    def __repr__(self):
+        return f"Posts('{self.title}', '{self.content}', '{self.date}')"
+
+
+install_posts_fts(Posts.__table__)
+install_people_summary(Posts.__table__)
+
+
+class People(db.Model):
+    """Reports per person, maintained from posts by the triggers in people.py.
+
+    A person is a normalized (surname_key, name_key) pair; name, surname
+    and the photo columns are taken from their latest post (with a photo).
+    """
+
+    __tablename__ = "people"
+    __table_args__ = (
+        # Keyset orders of /people
+        db.Index("ix_people_reports", "reports", "surname_key", "name_key"),
+        db.Index("ix_people_last_reported", "last_reported", "surname_key", "name_key"),
+    )
+    surname_key = db.Column(db.String(100), primary_key=True)
+    name_key = db.Column(db.String(100), primary_key=True)
+    name = db.Column(db.String(10), nullable=False)
+    surname = db.Column(db.String(30), nullable=False)
+    reports = db.Column(db.Integer, nullable=False)
+    first_reported = db.Column(db.DateTime, nullable=False)
+    last_reported = db.Column(db.DateTime, nullable=False)
+    latest_post_id = db.Column(db.Integer, nullable=False)
+    photo = db.Column(db.String(100), nullable=True)
+    thumbnail = db.Column(db.String(100), nullable=True)
+    medium = db.Column(db.String(100), nullable=True)
+
+    def __repr__(self):
+        return f"People('{self.name}', '{self.surname}', {self.reports})"
+
+# Trigram index over the distinct normalized names and surnames in posts.
+# Rows are only ever added; keys no longer used by any post simply match
+# nothing when joined back to posts.
+name_trigrams = db.Table(
+    "name_trigrams",
+    db.Column("trigram", db.String(3), primary_key=True),
+    db.Column("name_key", db.String(100), primary_key=True),
+    sqlite_with_rowid=False,
+)
+
+
+@event.listens_for(Posts.name, "set")
+def update_name_key(post, value, oldvalue, initiator):
+    post.name_key = normalize_name(value)
+
+
+@event.listens_for(Posts.surname, "set")
+def update_surname_key(post, value, oldvalue, initiator):
+    post.surname_key = normalize_name(value)
+
+
+def index_name_keys(connection, keys):
+    """Add the trigrams of `keys` to name_trigrams (existing ones are kept)."""
+    rows = [
+        {"trigram": trigram, "name_key": key}
+        for key in keys
+        if key
+        for trigram in trigrams(key)
+    ]
+    if rows:
+        connection.execute(name_trigrams.insert().prefix_with("OR IGNORE"), rows)
+
+
+@event.listens_for(db.session, "after_flush")
+def mark_data_changed(session, flush_context):
+    session.info["data_changed"] = True
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def mark_bulk_data_changed(orm_execute_state):
+    # Bulk imports insert through session.execute(), without a flush.
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["data_changed"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def bump_data_version(session):
+    # Any committed write invalidates every cached page at once.
+    if session.info.pop("data_changed", False):
+        page_cache.bump()
+
+
+@event.listens_for(db.session, "after_rollback")
+def forget_data_changes(session):
+    session.info.pop("data_changed", None)
+
+
+@event.listens_for(db.session, "after_flush")
+def index_post_names(session, flush_context):
+    keys = {
+        key
+        for post in (*session.new, *session.dirty)
+        if isinstance(post, Posts)
+        for key in (post.name_key, post.surname_key)
+    }
+    if keys:
+        index_name_keys(session.connection(), keys)
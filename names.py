@@ -0,0 +1,66 @@
+import re
+import unicodedata
+
+# Georgian national romanization. Mtavruli capitals are folded to
+# Mkhedruli by str.casefold() before this table is applied.
+GEORGIAN_TO_LATIN = {
+    "ა": "a", "ბ": "b", "გ": "g", "დ": "d", "ე": "e", "ვ": "v", "ზ": "z",
+    "თ": "t", "ი": "i", "კ": "k", "ლ": "l", "მ": "m", "ნ": "n", "ო": "o",
+    "პ": "p", "ჟ": "zh", "რ": "r", "ს": "s", "ტ": "t", "უ": "u", "ფ": "p",
+    "ქ": "k", "ღ": "gh", "ყ": "q", "შ": "sh", "ჩ": "ch", "ც": "ts", "ძ": "dz",
+    "წ": "ts", "ჭ": "ch", "ხ": "kh", "ჯ": "j", "ჰ": "h",
+}
+# Russian and Ukrainian Cyrillic, after the ICAO passport romanization,
+# so that "Беридзе" meets "ბერიძე". й, ё and ї are reduced to и, е and і
+# by the NFKD step before this table is applied.
+CYRILLIC_TO_LATIN = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "ґ": "g", "д": "d", "е": "e",
+    "є": "ie", "ж": "zh", "з": "z", "и": "i", "і": "i", "к": "k", "л": "l",
+    "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+    "у": "u", "ф": "f", "х": "kh", "ц": "ts", "ч": "ch", "ш": "sh",
+    "щ": "shch", "ъ": "", "ы": "y", "ь": "", "э": "e", "ю": "iu", "я": "ia",
+}
+# Older, informal or Russian-derived Latin spellings folded onto the
+# national ones.
+LATIN_VARIANTS = [("dzh", "j"), ("x", "kh"), ("tz", "ts"), ("w", "v")]
+
+_NON_LETTERS_RE = re.compile(r"[^a-z]+")
+_TRANSLITERATE = str.maketrans({**GEORGIAN_TO_LATIN, **CYRILLIC_TO_LATIN})
+
+
+def normalize_name(text):
+    """Fold a name to lower-case Latin letters for fuzzy comparison.
+
+    "ბერიძე", "ᲑᲔᲠᲘᲫᲔ", "Беридзе" and "Béridze" all become "beridze".
+    Digits, punctuation and spaces are dropped. A name in any other script
+    keeps its case-folded letters rather than becoming an empty key.
+    """
+    folded = unicodedata.normalize("NFKD", (text or "").casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    latin = folded.translate(_TRANSLITERATE)
+    for variant, standard in LATIN_VARIANTS:
+        latin = latin.replace(variant, standard)
+    return _NON_LETTERS_RE.sub("", latin) or "".join(
+        c for c in folded if c.isalpha()
+    )
+
+
+def trigrams(key):
+    """The set of padded trigrams of a normalized name.
+
+    Padding with two leading spaces and one trailing space makes short
+    names and matching first letters count, as in PostgreSQL's pg_trgm.
+    """
+    if not key:
+        return set()
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(query_trigrams, key, shared=None):
+    """Jaccard similarity of the trigram sets of two names, from 0 to 1."""
+    key_trigrams = trigrams(key)
+    if shared is None:
+        shared = len(query_trigrams & key_trigrams)
+    union = len(query_trigrams) + len(key_trigrams) - shared
+    return shared / union if union else 0.0
@@ -0,0 +1,162 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from flask import request, url_for
+from sqlalchemy import and_, false, or_, tuple_
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: str = None
+    prev_cursor: str = None
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values):
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Return the key values stored in `token`, or None if it is malformed."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = [_decode_value(value) for value in json.loads(raw)]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+    if len(values) != size:
+        return None
+    return values
+
+
+def _nullable(column):
+    return getattr(getattr(column, "expression", column), "nullable", False)
+
+
+def _beyond(column, value, descending):
+    """Rows strictly past `value` in this column's sort order.
+
+    SQLite sorts NULL first ascending and last descending, so NULL keys
+    are compared explicitly instead of through `<` / `>`.
+    """
+    nullable = _nullable(column)
+    if value is None:
+        return column.isnot(None) if not descending else false()
+    if descending:
+        return or_(column < value, column.is_(None)) if nullable else column < value
+    return column > value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(keys, values):
+    directions = {descending for _, descending in keys}
+    if (
+        len(directions) == 1
+        and None not in values
+        and not any(_nullable(column) for column, _ in keys)
+    ):
+        # A single row-value comparison lets SQLite seek straight into the
+        # (date, id) index instead of expanding an OR.
+        columns = [column for column, _ in keys]
+        if len(columns) == 1:
+            columns, values = columns[0], values[0]
+        else:
+            columns, values = tuple_(*columns), tuple_(*values)
+        return columns < values if directions.pop() else columns > values
+    return _after_nullable(keys, values)
+
+
+def _after_nullable(keys, values):
+    (column, descending), *rest = keys
+    value, *rest_values = values
+    condition = _beyond(column, value, descending)
+    if rest:
+        condition = or_(
+            condition,
+            and_(_equal(column, value), _after_nullable(rest, rest_values)),
+        )
+    return condition
+
+
+def _ordering(column, descending):
+    return column.desc() if descending else column.asc()
+
+
+def keyset_page(query, keys, page_size, after=None, before=None):
+    """Fetch one page of `query` ordered by `keys`.
+
+    `keys` is a list of `(column, descending)` pairs whose last column must
+    be unique (normally the primary key). `after` / `before` are cursors
+    taken from a previous Page; each page costs one indexed range scan of
+    `page_size + 1` rows no matter how deep it is.
+
+    Items are the query's entities, or row tuples when it selects several
+    columns.
+    """
+    columns = [column for column, _ in keys]
+    width = len(query.column_descriptions)
+    after_values = decode_cursor(after, len(keys))
+    before_values = decode_cursor(before, len(keys)) if after_values is None else None
+    backwards = before_values is not None
+
+    if backwards:
+        reversed_keys = [(column, not descending) for column, descending in keys]
+        query = query.filter(_after(reversed_keys, before_values))
+        query = query.order_by(*[_ordering(c, d) for c, d in reversed_keys])
+    else:
+        if after_values is not None:
+            query = query.filter(_after(keys, after_values))
+        query = query.order_by(*[_ordering(c, d) for c, d in keys])
+
+    rows = query.add_columns(*columns).limit(page_size + 1).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    if width == 1:
+        page = Page(items=[row[0] for row in rows])
+    else:
+        page = Page(items=[row[:width] for row in rows])
+    if rows:
+        first, last = rows[0][width:], rows[-1][width:]
+        if backwards:
+            page.next_cursor = encode_cursor(last)
+            page.prev_cursor = encode_cursor(first) if has_more else None
+        else:
+            page.next_cursor = encode_cursor(last) if has_more else None
+            page.prev_cursor = encode_cursor(first) if after_values else None
+    return page
+
+
+def url_for_page(**cursors):
+    """URL of the current view with the given cursor arguments replaced.
+
+    Keeps the other query parameters (search, order_by, ...) so paging
+    never drops the active filter.
+    """
+    args = dict(request.view_args or {}, **request.args.to_dict())
+    args.update(cursors)
+    return url_for(
+        request.endpoint, **{key: value for key, value in args.items() if value}
+    )
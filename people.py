@@ -0,0 +1,145 @@
+from sqlalchemy import DDL, event, text
+
+_SUMMARY_COLUMNS = (
+    "surname_key, name_key, name, surname, reports,"
+    " first_reported, last_reported, latest_post_id"
+)
+
+
+def _summarize(posts_filter, people_filter):
+    """Statements that recompute the people rows selected by the filters.
+
+    `posts_filter` picks the posts to aggregate and `people_filter` the
+    same people in the summary. Counts and dates come from all of a
+    person's posts, the displayed spelling from the latest one and the
+    photo from the latest one that has a photo. Both walk ix_posts_person,
+    so the cost is the number of posts of the people involved.
+    """
+    person = (
+        "posts.surname_key = people.surname_key"
+        " AND posts.name_key = people.name_key"
+    )
+    return [
+        f"DELETE FROM people WHERE {people_filter}",
+        f"""
+        INSERT INTO people ({_SUMMARY_COLUMNS})
+        SELECT {_SUMMARY_COLUMNS} FROM (
+            SELECT surname_key, name_key, name, surname, date AS last_reported,
+                id AS latest_post_id,
+                count(*) OVER person AS reports,
+                min(date) OVER person AS first_reported,
+                row_number() OVER (person ORDER BY date DESC, id DESC) AS position
+            FROM posts
+            WHERE {posts_filter} AND surname_key <> '' AND name_key IS NOT NULL
+            WINDOW person AS (PARTITION BY surname_key, name_key)
+        )
+        WHERE position = 1
+        """,
+        f"""
+        UPDATE people SET (photo, thumbnail, medium) = (
+            SELECT photo, thumbnail, medium FROM posts
+            WHERE {person} AND photo IS NOT NULL
+            ORDER BY date DESC, id DESC LIMIT 1
+        )
+        WHERE {people_filter}
+        """,
+    ]
+
+
+def _summarize_person(row, condition="1"):
+    """_summarize() for the person of the trigger row `row` ("old" or "new")."""
+    person = (
+        f"surname_key = {row}.surname_key AND name_key = {row}.name_key"
+        f" AND {condition}"
+    )
+    return _summarize(person, person)
+
+
+_KEYS_CHANGED = (
+    "(new.surname_key IS NOT old.surname_key OR new.name_key IS NOT old.name_key)"
+)
+
+
+def _trigger_body(statements):
+    return "".join(f"{statement.strip()};\n" for statement in statements)
+
+
+# Statements that recompute the whole people table from posts.
+REBUILD_PEOPLE = _summarize("1", "1")
+
+# Keep people in step with posts inside the writing transaction. A new
+# post is folded into its person's row directly; deletes and edits, and
+# back-dated inserts with a photo, recompute the people they touch.
+PEOPLE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS people_ai AFTER INSERT ON posts
+    WHEN new.surname_key <> '' AND new.name_key IS NOT NULL BEGIN
+        INSERT INTO people (
+            {_SUMMARY_COLUMNS}, photo, thumbnail, medium
+        ) VALUES (
+            new.surname_key, new.name_key, new.name, new.surname, 1,
+            new.date, new.date, new.id, new.photo, new.thumbnail, new.medium
+        )
+        ON CONFLICT (surname_key, name_key) DO UPDATE SET
+            reports = reports + 1,
+            first_reported = min(first_reported, excluded.first_reported),
+            last_reported = max(last_reported, excluded.last_reported),
+            latest_post_id = iif(
+                excluded.last_reported >= last_reported,
+                excluded.latest_post_id, latest_post_id
+            ),
+            name = iif(excluded.last_reported >= last_reported, excluded.name, name),
+            surname = iif(
+                excluded.last_reported >= last_reported, excluded.surname, surname
+            ),
+            photo = iif(
+                excluded.photo IS NOT NULL AND excluded.last_reported >= last_reported,
+                excluded.photo, photo
+            ),
+            thumbnail = iif(
+                excluded.photo IS NOT NULL AND excluded.last_reported >= last_reported,
+                excluded.thumbnail, thumbnail
+            ),
+            medium = iif(
+                excluded.photo IS NOT NULL AND excluded.last_reported >= last_reported,
+                excluded.medium, medium
+            );
+        UPDATE people SET (photo, thumbnail, medium) = (
+            SELECT photo, thumbnail, medium FROM posts
+            WHERE posts.surname_key = people.surname_key
+                AND posts.name_key = people.name_key
+                AND photo IS NOT NULL
+            ORDER BY date DESC, id DESC LIMIT 1
+        )
+        WHERE surname_key = new.surname_key AND name_key = new.name_key
+            AND new.photo IS NOT NULL AND new.date < last_reported;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS people_ad AFTER DELETE ON posts BEGIN
+        {_trigger_body(_summarize_person("old"))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS people_au
+    AFTER UPDATE OF name, surname, name_key, surname_key, date,
+        photo, thumbnail, medium ON posts BEGIN
+        {_trigger_body(_summarize_person("old"))}
+        {_trigger_body(_summarize_person("new", _KEYS_CHANGED))}
+    END
+    """,
+]
+
+
+def install_people_summary(posts_table):
+    """Create the people triggers whenever `posts` is created."""
+    for statement in PEOPLE_TRIGGERS:
+        event.listen(
+            posts_table, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
+
+
+def rebuild_people(connection):
+    """Recompute every row of people from posts on `connection`."""
+    for statement in REBUILD_PEOPLE:
+        connection.execute(text(statement))
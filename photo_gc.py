@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from images import VARIANTS
+
+
+@dataclass
+class CollectionReport:
+    scanned: int = 0
+    orphaned: list = field(default_factory=list)  # Relative paths
+    orphaned_bytes: int = 0
+    removed: int = 0
+
+
+def _owner(filename):
+    """(photo stem, is_variant) of a stored file; variants share the stem."""
+    for variant in VARIANTS:
+        suffix = f"_{variant}.jpg"
+        if filename.endswith(suffix):
+            return filename[: -len(suffix)], True
+    return os.path.splitext(filename)[0], False
+
+
+class PhotoCollector:
+    """Removes stored photo files that no post references any more.
+
+    The upload folder is walked one directory at a time and files are
+    grouped by the photo they belong to (the original and its variants).
+    Every `batch_size` photos, `referenced(names)` is asked which of the
+    candidate photo names posts still use; between batches the collector
+    sleeps for `pause` seconds, so it only ever holds short reads and
+    leaves the request threads the CPU and the database.
+
+    Files modified in the last `grace` seconds are never removed: that
+    covers uploads still being written and deduplicated uploads whose
+    post is not committed yet (store_upload touches the shared file).
+    """
+
+    def __init__(
+        self,
+        upload_folder,
+        referenced,
+        extensions,
+        batch_size=200,
+        pause=0.1,
+        grace=3600,
+        logger=None,
+    ):
+        self.upload_folder = upload_folder
+        self.referenced = referenced
+        self.extensions = extensions
+        self.batch_size = batch_size
+        self.pause = pause
+        self.grace = grace
+        self.logger = logger
+        self._wake = threading.Event()
+        self._collector_pid = None
+
+    def _photos(self):
+        """Yield (candidate photo names, relative file paths) per photo."""
+        for directory, subdirectories, filenames in os.walk(self.upload_folder):
+            subdirectories.sort()
+            relative_dir = os.path.relpath(directory, self.upload_folder)
+            relative_dir = relative_dir.replace(os.sep, "/")
+            groups = {}
+            for filename in sorted(filenames):
+                if filename.startswith("."):
+                    continue
+                stem, is_variant = _owner(filename)
+                files, originals = groups.setdefault(stem, ([], []))
+                files.append(filename)
+                if not is_variant:
+                    originals.append(filename)
+            for stem, (files, originals) in groups.items():
+                # The original may be missing while a post still points at
+                # it, so every name it could have been stored under counts.
+                names = {f"{stem}.{ext}" for ext in self.extensions}
+                names.update(originals)
+                if relative_dir != ".":
+                    names = {f"{relative_dir}/{name}" for name in names}
+                    files = [f"{relative_dir}/{name}" for name in files]
+                yield names, files
+
+    def _batches(self):
+        batch = []
+        for photo in self._photos():
+            batch.append(photo)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _stale(self, relative, now):
+        try:
+            stat = os.stat(os.path.join(self.upload_folder, relative))
+        except FileNotFoundError:
+            return None
+        return stat if stat.st_mtime <= now - self.grace else None
+
+    def collect(self, dry_run=False):
+        """Remove (or with `dry_run`, only list) the unreferenced files."""
+        report = CollectionReport()
+        if not os.path.isdir(self.upload_folder):
+            return report
+        for number, batch in enumerate(self._batches()):
+            if number and self.pause:
+                time.sleep(self.pause)
+            in_use = self.referenced(
+                sorted({name for names, _ in batch for name in names})
+            )
+            now = time.time()
+            for names, files in batch:
+                report.scanned += len(files)
+                if names & in_use:
+                    continue
+                for relative in files:
+                    stat = self._stale(relative, now)
+                    if stat is None:
+                        continue
+                    report.orphaned.append(relative)
+                    report.orphaned_bytes += stat.st_size
+                    if dry_run:
+                        continue
+                    # Checked again right before removing, in case an
+                    # identical upload was stored meanwhile.
+                    if self._stale(relative, time.time()) is None:
+                        continue
+                    try:
+                        os.remove(os.path.join(self.upload_folder, relative))
+                    except FileNotFoundError:
+                        continue
+                    report.removed += 1
+        return report
+
+    def wake(self):
+        """Run the background collection now instead of at its next interval."""
+        self._wake.set()
+
+    def start(self, interval):
+        """Collect every `interval` seconds in a daemon thread of this process."""
+        if not interval or self._collector_pid == os.getpid():
+            return
+        self._collector_pid = os.getpid()
+
+        def collect_forever():
+            while True:
+                self._wake.wait(interval)
+                self._wake.clear()
+                try:
+                    report = self.collect()
+                except Exception:
+                    if self.logger is not None:
+                        self.logger.exception("Photo collection failed")
+                    continue
+                if report.removed and self.logger is not None:
+                    self.logger.info(
+                        "Removed %d unreferenced photo files (%d bytes)",
+                        report.removed,
+                        report.orphaned_bytes,
+                    )
+
+        threading.Thread(
+            target=collect_forever, name="photo-collector", daemon=True
+        ).start()
@@ -0,0 +1,190 @@
+import os
+import time
+
+import click
+from flask import Blueprint, current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from extensions import db, photo_collector, variant_pool
+from forms import PHOTO_EXTENSIONS
+from images import VARIANTS, VariantPool, variant_name
+from models import Posts
+from photo_gc import PhotoCollector
+from uploads import is_content_path, remove_stored, store_existing
+
+# Photo maintenance commands; the uploads themselves are served as static files.
+bp = Blueprint("photos", __name__, cli_group=None)
+
+
+def upload_folder(app=None):
+    return os.path.abspath((app or current_app).config["UPLOAD_FOLDER"])
+
+
+def referenced_photos(names):
+    """The subset of photo `names` that some post still points at."""
+    with db.engines["readonly"].connect() as connection:
+        return set(
+            connection.scalars(db.select(Posts.photo).where(Posts.photo.in_(names)))
+        )
+
+
+def init_photos(app):
+    """Set up the variant pool and the collector of unreferenced photos.
+
+    Neither starts a process or thread here: the pool spawns its workers
+    on the first upload and the collector starts with the first request.
+    """
+    app.extensions["variant_pool"] = VariantPool(app.config["IMAGE_WORKERS"])
+
+    def referenced(names):
+        with app.app_context():
+            return referenced_photos(names)
+
+    collector = PhotoCollector(
+        upload_folder(app),
+        referenced,
+        PHOTO_EXTENSIONS,
+        batch_size=app.config["PHOTO_GC_BATCH_SIZE"],
+        pause=app.config["PHOTO_GC_PAUSE"],
+        grace=app.config["PHOTO_GC_GRACE"],
+        logger=app.logger,
+    )
+    app.extensions["photo_collector"] = collector
+
+    @app.before_request
+    def start_photo_collector():
+        collector.start(app.config["PHOTO_GC_INTERVAL"])
+
+
+def release_photo(photo, *variants):
+    """Remove a stored photo and its variants once no post references it.
+
+    Identical uploads share one file, so the posts pointing at it act as
+    its reference count. The variants are named after the photo's stem
+    alone, so they are shared with the same bytes stored under another
+    extension and kept while any post uses one of those. A photo touched
+    within PHOTO_GC_GRACE may belong to a deduplicated upload whose post
+    is not committed yet; it is left to the photo collector.
+    """
+    if not photo or Posts.query.filter_by(photo=photo).first() is not None:
+        return
+    folder = upload_folder()
+    try:
+        modified = os.stat(os.path.join(folder, photo)).st_mtime
+    except FileNotFoundError:
+        modified = 0
+    if modified > time.time() - current_app.config["PHOTO_GC_GRACE"]:
+        return
+    stem = os.path.splitext(photo)[0]
+    siblings = [f"{stem}.{ext}" for ext in PHOTO_EXTENSIONS]
+    if Posts.query.filter(Posts.photo.in_(siblings)).first() is not None:
+        variants = ()
+    remove_stored(folder, photo, *variants)
+
+
+def queue_photo_variants(photo_filename):
+    """Generate the thumbnail/medium variants of a stored photo in the background.
+
+    Every post pointing at the photo gets them; until the worker finishes,
+    the templates keep serving the original.
+    """
+    app = current_app._get_current_object()
+
+    def store_variants(future):
+        try:
+            variants = future.result()
+        except Exception:
+            app.logger.exception("Could not resize photo %s", photo_filename)
+            return
+        with app.app_context():
+            try:
+                db.session.execute(
+                    db.update(Posts)
+                    .where(Posts.photo == photo_filename)
+                    .values(**variants)
+                )
+                db.session.commit()
+            except SQLAlchemyError:
+                # `flask make-variants` fills in what is lost here.
+                db.session.rollback()
+                app.logger.exception(
+                    "Could not store the variants of photo %s", photo_filename
+                )
+
+    return variant_pool.submit(upload_folder(), photo_filename, store_variants)
+
+
+def generate_missing_variants():
+    """Create the variants of every stored photo that has none yet and wait."""
+    photos = db.session.scalars(
+        db.select(Posts.photo)
+        .where(Posts.photo.isnot(None), Posts.thumbnail.is_(None))
+        .distinct()
+    ).all()
+    futures = [queue_photo_variants(photo) for photo in photos]
+    for future in futures:
+        future.exception()
+    variant_pool.shutdown()
+    return len(futures)
+
+
+@bp.cli.command("make-variants")
+def make_variants_command():
+    """Generate missing photo variants for existing posts."""
+    click.echo(f"Processed {generate_missing_variants()} photos")
+
+
+@bp.cli.command("collect-photos")
+@click.option("--dry-run", is_flag=True, help="Only list the files that would go")
+def collect_photos_command(dry_run):
+    """Delete stored photo files that no post references."""
+    report = photo_collector.collect(dry_run=dry_run)
+    if dry_run:
+        for relative in report.orphaned:
+            click.echo(relative)
+    click.echo(
+        f"Scanned {report.scanned} files, {len(report.orphaned)} unreferenced"
+        f" ({report.orphaned_bytes / 1024 / 1024:.1f} MiB), removed {report.removed}"
+    )
+
+
+@bp.cli.command("migrate-uploads")
+def migrate_uploads_command():
+    """Move flat uploads into the content-addressed, sharded layout."""
+    folder = upload_folder()
+    rows = db.session.execute(
+        db.select(Posts.photo, Posts.thumbnail, Posts.medium)
+        .where(Posts.photo.isnot(None))
+        .distinct()
+    ).all()
+    moved = deduplicated = missing = 0
+    for photo, *variants in rows:
+        if is_content_path(photo):
+            continue
+        if not os.path.exists(os.path.join(folder, photo)):
+            click.echo(f"Missing file, skipped: {photo}")
+            missing += 1
+            continue
+        new_photo, created = store_existing(folder, photo)
+        values = {"photo": new_photo}
+        for variant, old_name in zip(VARIANTS, variants):
+            if not old_name:
+                continue
+            new_name = variant_name(new_photo, variant)
+            old_path = os.path.join(folder, old_name)
+            if os.path.exists(os.path.join(folder, new_name)):
+                remove_stored(folder, old_name)
+            elif os.path.exists(old_path):
+                os.replace(old_path, os.path.join(folder, new_name))
+            else:
+                new_name = None
+            values[variant] = new_name
+        db.session.execute(
+            db.update(Posts).where(Posts.photo == photo).values(**values)
+        )
+        db.session.commit()
+        moved += 1
+        deduplicated += not created
+    click.echo(
+        f"Moved {moved} photos ({deduplicated} deduplicated, {missing} missing)"
+    )
@@ -0,0 +1,335 @@
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import click
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy.orm import joinedload
+from werkzeug.datastructures import FileStorage, MultiDict
+
+from auth import current_user, form_viewer, login_required, viewer
+from bulk_import import FORMATS, detect_format, import_records, read_records
+from cache import cached
+from config import navigation_items
+from extensions import db, post_writer
+from forms import PHOTO_EXTENSIONS, PostForm
+from group_commit import WriterBusy
+from models import Posts, Users, index_name_keys
+from names import normalize_name
+from pagination import keyset_page
+from photos import (
+    generate_missing_variants,
+    queue_photo_variants,
+    release_photo,
+    upload_folder,
+)
+from search import ranked_matches
+from streaming import stream_page
+from uploads import store_upload
+
+bp = Blueprint("posts", __name__, cli_group=None)
+
+
+def post_listing(query, search_query, order_by):
+    """Apply the post search and ordering shared by /workers and the API.
+
+    Returns the filtered query and the keyset pagination keys.
+    """
+    matches = ranked_matches(search_query)
+
+    if matches is not None:
+        query = query.join(matches, matches.c.post_id == Posts.id)
+
+    if order_by == "date_asc":
+        keys = [(Posts.date, False), (Posts.id, False)]
+    elif order_by == "relevance" and matches is not None:
+        keys = [(matches.c.rank, False), (Posts.id, False)]
+    else:
+        keys = [(Posts.date, True), (Posts.id, True)]
+    return query, keys
+
+
+@bp.route("/")
+@cached(viewer)
+def home():
+    return render_template("index.html", navigation_items=navigation_items)
+
+
+@bp.route("/about")
+@cached(viewer)
+def about():
+    return render_template("about.html", navigation_items=navigation_items)
+
+
+@bp.route("/view_post/<int:post_id>")
+@cached(viewer)
+def view_post(post_id):
+    post = Posts.query.options(joinedload(Posts.author)).get_or_404(post_id)
+    return render_template(
+        "view_post.html", post=post, navigation_items=navigation_items
+    )
+
+
+def save_post(post):
+    """Insert a new post, through the group-commit writer if GROUP_COMMIT is on.
+
+    Raises WriterBusy when the writer's queue is full.
+    """
+    if current_app.config["GROUP_COMMIT"]:
+        post_writer.insert(post, current_app.config["GROUP_COMMIT_TIMEOUT"])
+    else:
+        db.session.add(post)
+        db.session.commit()
+
+
+@bp.route("/workers", methods=["GET", "POST"])
+@login_required  # or any decorator you use to protect this route
+@cached(form_viewer)
+def workers():
+    form = PostForm()
+    search_query = request.args.get("search")
+    order_by = request.args.get(
+        "order_by", "date_desc")
+
+    status, headers = 200, {}
+    if form.validate_on_submit():
+        user = current_user()  # Assuming logged-in user
+        if form.photo.data:
+            photo_filename, created = store_upload(upload_folder(), form.photo.data)
+        else:
+            photo_filename, created = None, False
+
+        variants = {}
+        if photo_filename and not created:
+            # Same bytes as an earlier upload: reuse its variants if ready.
+            existing = Posts.query.filter(
+                Posts.photo == photo_filename, Posts.thumbnail.isnot(None)
+            ).first()
+            if existing:
+                variants = {"thumbnail": existing.thumbnail, "medium": existing.medium}
+
+        new_post = Posts(
+            name=form.name.data,
+            surname=form.surname.data,
+            title=form.title.data,
+            content=form.content.data,
+            photo=photo_filename,  # Save the photo filename to the database
+            user_id=user.id,
+            **variants,
+        )
+        try:
+            save_post(new_post)
+        except WriterBusy:
+            # The form is shown again with what was typed; an uploaded
+            # photo left unreferenced is removed by the photo collector.
+            flash("სერვერი გადატვირთულია. სცადეთ ცოტა ხანში.", "danger")
+            status, headers = 503, {"Retry-After": "1"}
+        else:
+            if photo_filename and not variants:
+                queue_photo_variants(photo_filename)
+            flash("პოსტი წარმატებით დაემატა", "success")
+            return redirect(url_for("posts.workers"))
+
+    query, keys = post_listing(
+        Posts.query.options(joinedload(Posts.author)), search_query, order_by
+    )
+    page = keyset_page(
+        query,
+        keys,
+        current_app.config["PAGE_SIZE"],
+        after=request.args.get("after"),
+        before=request.args.get("before"),
+    )
+
+    return (
+        stream_page(
+            "workers.html",
+            posts=page.items,
+            page=page,
+            form=form,
+            navigation_items=navigation_items,
+        ),
+        status,
+        headers,
+    )
+
+
+@bp.route("/workers/delete_post/<int:post_id>", methods=["POST"])
+@login_required
+def delete_post(post_id):
+    post = Posts.query.get_or_404(post_id)
+    user = current_user()
+    if user is None or (post.user_id != user.id and not user.is_admin):
+        flash("თქვენ არ შეგიძლიათ ამ პოსტის წაშლა", "danger")
+        return redirect(url_for("posts.workers"))
+
+    photos = (post.photo, post.thumbnail, post.medium)
+    db.session.delete(post)
+    db.session.commit()
+    release_photo(*photos)
+    flash("პოსტი წაშლილია", "success")
+    return redirect(url_for("posts.workers"))
+
+
+def post_record_validator(photo_dir=None):
+    """Build a validator applying PostForm's rules to imported records.
+
+    Photos are looked up in `photo_dir` and stored like uploads once the
+    rest of the record is valid. Returns `(values, errors)` per record.
+    """
+    folder = upload_folder()
+    # Binding a form's fields is most of its cost, so one form is reused.
+    form = PostForm(formdata=None, meta={"csrf": False})
+
+    def validate(record):
+        form.process(
+            MultiDict(
+                {key: str(value) for key, value in record.items() if value is not None}
+            )
+        )
+        form.validate()
+        errors = dict(form.errors)
+        values = {
+            "name": form.name.data,
+            "surname": form.surname.data,
+            "title": form.title.data,
+            "content": form.content.data,
+            "photo": None,
+            "date": datetime.utcnow(),
+            "name_key": normalize_name(form.name.data),
+            "surname_key": normalize_name(form.surname.data),
+        }
+        if record.get("date"):
+            try:
+                date = datetime.fromisoformat(str(record["date"]))
+            except ValueError:
+                errors["date"] = ["Not an ISO 8601 date"]
+            else:
+                if date.tzinfo is not None:
+                    date = date.astimezone(timezone.utc).replace(tzinfo=None)
+                values["date"] = date
+
+        photo = record.get("photo")
+        if photo:
+            path = os.path.join(photo_dir or "", str(photo))
+            ext = os.path.splitext(path)[1].lstrip(".").lower()
+            if ext not in PHOTO_EXTENSIONS:
+                errors["photo"] = ["File does not have an approved extension"]
+            elif photo_dir is None or not os.path.isfile(path):
+                errors["photo"] = ["Photo not found"]
+            elif not errors:
+                with open(path, "rb") as handle:
+                    values["photo"], _ = store_upload(
+                        folder, FileStorage(handle, filename=path)
+                    )
+        return values, errors
+
+    return validate
+
+
+def import_posts(
+    stream,
+    fmt,
+    user_id,
+    batch_size=1000,
+    photo_dir=None,
+    on_reject=None,
+    on_progress=None,
+):
+    """Stream records from `stream` into posts, one transaction per batch."""
+
+    def insert(batch):
+        for values in batch:
+            values["user_id"] = user_id
+        db.session.execute(Posts.__table__.insert(), batch)
+        index_name_keys(
+            db.session.connection(),
+            {values[key] for values in batch for key in ("name_key", "surname_key")},
+        )
+        db.session.commit()
+
+    return import_records(
+        read_records(stream, fmt),
+        post_record_validator(photo_dir),
+        insert,
+        batch_size,
+        on_reject or (lambda line_number, record, errors: None),
+        on_progress,
+    )
+
+
+@bp.cli.command("import-posts")
+@click.argument(
+    "source", type=click.Path(exists=True, dir_okay=False, allow_dash=True)
+)
+@click.option(
+    "--format", "fmt", type=click.Choice(FORMATS), help="Default: from the extension"
+)
+@click.option("--user", "username", required=True, help="Author of the imported posts")
+@click.option(
+    "--photos",
+    "photo_dir",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory the records' photo names are relative to",
+)
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option(
+    "--rejects",
+    type=click.File("w", encoding="utf-8"),
+    help="Write rejected rows here as JSONL instead of printing them",
+)
+def import_posts_command(source, fmt, username, photo_dir, batch_size, rejects):
+    """Bulk import posts from a CSV or JSONL file ("-" for stdin).
+
+    Rows need name, surname, title and content columns and may have photo
+    and date (ISO 8601) columns. They are checked with PostForm's rules.
+    """
+    user = Users.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f"No user named {username}")
+    fmt = fmt or detect_format(source)
+
+    def report_reject(line_number, record, errors):
+        if rejects is not None:
+            rejects.write(
+                json.dumps(
+                    {"line": line_number, "errors": errors, "record": record},
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+            return
+        problems = "; ".join(
+            f"{name}: {' '.join(messages)}" for name, messages in errors.items()
+        )
+        click.echo(f"\rLine {line_number} rejected: {problems}", err=True)
+
+    def report_progress(stats):
+        click.echo(
+            f"\rImported {stats.imported}, rejected {stats.rejected}"
+            f" ({stats.rows_per_second:.0f} rows/s)",
+            err=True,
+            nl=False,
+        )
+
+    if source == "-":
+        stream = sys.stdin
+    else:
+        stream = open(source, encoding="utf-8-sig", newline="")
+    with stream:
+        stats = import_posts(
+            stream, fmt, user.id, batch_size, photo_dir, report_reject, report_progress
+        )
+    click.echo(err=True)
+    if photo_dir:
+        click.echo(f"Generated variants for {generate_missing_variants()} photos")
+    click.echo(f"Imported {stats.imported} posts, rejected {stats.rejected} rows")
@@ -0,0 +1,57 @@
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class TooManyQueries(RuntimeError):
+    pass
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statements = g.get("sql_statements", 0) + 1
+
+
+def _check_statement_count(app, namespace, method, path):
+    limit = app.config.get("SQL_STATEMENT_LIMIT")
+    count = namespace.get("sql_statements", 0)
+    if app.testing and limit is not None and count > limit:
+        raise TooManyQueries(
+            f"{method} {path} issued {count} SQL statements (limit {limit})"
+        )
+
+
+def check_after_stream(chunks):
+    """Check the request's statement count once `chunks` are exhausted.
+
+    A streamed template runs its queries while the body is sent, after
+    after_request has been called, so the check is moved to its end.
+    """
+    g.statement_check_deferred = True
+    return _checked(
+        chunks,
+        current_app._get_current_object(),
+        g._get_current_object(),
+        request.method,
+        request.path,
+    )
+
+
+def _checked(chunks, app, namespace, method, path):
+    yield from chunks
+    _check_statement_count(app, namespace, method, path)
+
+
+def init_query_guard(app):
+    """Fail any request that issues more than SQL_STATEMENT_LIMIT statements.
+
+    Only enforced while TESTING is on, so an N+1 loop in a view shows up as
+    an error in the test client instead of a slow page in production.
+    """
+    event.listen(Engine, "before_cursor_execute", _count_statement)
+
+    @app.after_request
+    def check_statement_count(response):
+        if not g.get("statement_check_deferred"):
+            _check_statement_count(app, g, request.method, request.path)
+        return response
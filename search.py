@@ -0,0 +1,98 @@
+import re
+
+from sqlalchemy import DDL, column, event, func, select, table
+
+# External-content FTS5 index over the searchable Posts columns. unicode61
+# treats Mkhedruli letters as token characters, and the 2/3 character prefix
+# indexes keep the "type a few letters" searches from walking the whole term
+# list.
+POSTS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        name, surname, title, content,
+        content='posts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, name, surname, title, content)
+        VALUES (new.id, new.name, new.surname, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, name, surname, title, content)
+        VALUES ('delete', old.id, old.name, old.surname, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au
+    AFTER UPDATE OF name, surname, title, content ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, name, surname, title, content)
+        VALUES ('delete', old.id, old.name, old.surname, old.title, old.content);
+        INSERT INTO posts_fts(rowid, name, surname, title, content)
+        VALUES (new.id, new.name, new.surname, new.title, new.content);
+    END
+    """,
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+]
+
+posts_fts = table("posts_fts", column("rowid"), column("posts_fts"))
+
+_TOKEN_RE = re.compile(r"\w+")
+_GEORGIAN_RE = re.compile("[\u10a0-\u10ff\u1c90-\u1cbf]")
+
+
+def install_posts_fts(posts_table):
+    """Create the FTS index and its triggers whenever `posts` is created."""
+    for statement in POSTS_FTS_DDL:
+        event.listen(
+            posts_table, "after_create", DDL(statement).execute_if(dialect="sqlite")
+        )
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep Alembic autogenerate from dropping the FTS tables it cannot model."""
+    return not (type_ == "table" and name.startswith("posts_fts"))
+
+
+def match_expression(search_query):
+    """Turn free text from the search box into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so user input can never be
+    parsed as FTS syntax. SQLite's unicode61 tokenizer does not fold
+    Mtavruli capitals, so Georgian words also match their upper-case form.
+    Returns None when the input has no searchable words.
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(search_query or ""):
+        variants = [token.casefold()]
+        if _GEORGIAN_RE.search(token):
+            variants.append(variants[0].upper())
+        terms.append(
+            "(" + " OR ".join(f'"{variant}"*' for variant in variants) + ")"
+        )
+    if not terms:
+        return None
+    return " AND ".join(terms)
+
+
+def ranked_matches(search_query):
+    """Subquery of (post_id, rank) for posts matching `search_query`.
+
+    `rank` is bm25, where lower is more relevant. Returns None when the
+    input has no searchable words.
+    """
+    expression = match_expression(search_query)
+    if expression is None:
+        return None
+    return (
+        select(
+            posts_fts.c.rowid.label("post_id"),
+            func.bm25(posts_fts.c.posts_fts).label("rank"),
+        )
+        .where(posts_fts.c.posts_fts.match(expression))
+        .subquery("post_matches")
+    )
@@ -0,0 +1,150 @@
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask.cli import ScriptInfo
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+
+class RequestHandler(WSGIRequestHandler):
+    # Seconds an idle keep-alive connection may hold a pool thread.
+    timeout = 5
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug's WSGI server, answering requests on a fixed thread pool.
+
+    With `fd` it accepts on an already listening socket, shared with the
+    other worker processes.
+    """
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host, port, app, threads, fd=None):
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="request")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        if hasattr(self, "_pool"):
+            self._pool.shutdown(wait=True)
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _run_worker(app, listener, threads):
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    host, port = listener.getsockname()[:2]
+    server = PooledWSGIServer(host, port, app, threads, fd=listener.fileno())
+    try:
+        server.serve_forever()  # Returns on SIGTERM/SIGINT
+    finally:
+        # The worker leaves through os._exit(), past the atexit hooks that
+        # would stop these pools' spawned processes.
+        for name in ("hash_pool", "variant_pool"):
+            pool = app.extensions.get(name)
+            if pool is not None:
+                pool.shutdown()
+
+
+def serve(app, host="127.0.0.1", port=8000, workers=2, threads=8):
+    """Serve `app` from `workers` forked processes of `threads` threads each.
+
+    The app is built once, here, and the workers are forked from it with
+    no app context active. sqlite_profile disposes of the inherited
+    connection pools in every child, and the per-process pools, caches
+    and threads (sessions, hashing, photos, group commit) are started by
+    each worker on first use. A worker that dies is replaced; SIGTERM or
+    SIGINT stops them all after their current requests.
+    """
+    listener = socket.create_server((host, port), backlog=2048)
+    # Every worker polls the socket; the losers of a race for a
+    # connection must not block in accept().
+    listener.setblocking(False)
+    children = {}
+
+    def spawn(number):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _run_worker(app, listener, threads)
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                # Never return into the parent's code, or run its atexit hooks.
+                os._exit(status)
+        children[pid] = number
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for number in range(workers):
+        spawn(number)
+    click.echo(
+        f"Serving on http://{host}:{listener.getsockname()[1]}"
+        f" with {workers} workers x {threads} threads (pid {os.getpid()})"
+    )
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        number = children.pop(pid, None)
+        if number is not None and not stopping:
+            click.echo(
+                f"Worker {pid} exited with status {status}, restarting", err=True
+            )
+            time.sleep(0.1)  # Don't spin if every start fails
+            spawn(number)
+    listener.close()
+
+
+@click.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8000, show_default=True)
+@click.option(
+    "--workers",
+    default=os.cpu_count() or 1,
+    show_default="CPU count",
+    help="Worker processes",
+)
+@click.option("--threads", default=8, show_default=True, help="Threads per worker")
+@click.pass_context
+def serve_command(ctx, host, port, workers, threads):
+    """Run the app in production: forked workers, each with a thread pool."""
+    if not hasattr(os, "fork"):
+        raise click.ClickException("`flask serve` needs os.fork()")
+    app = ctx.ensure_object(ScriptInfo).load_app()
+    if app.debug:
+        click.echo("Debug mode is on; turn it off in production.", err=True)
+    sys.stdout.flush()
+    serve(app, host, port, workers, threads)
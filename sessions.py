@@ -0,0 +1,192 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request
+from flask_session.base import ServerSideSession, ServerSideSessionInterface
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        expiry REAL NOT NULL
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expiry)",
+]
+
+
+class SQLiteSession(ServerSideSession):
+    pass
+
+
+class SessionCache:
+    """Small LRU of encoded sessions, shared by the threads of one process.
+
+    Entries are only trusted for `ttl` seconds so a logout served by another
+    worker process is picked up quickly. Under a multi-process server
+    (`flask serve`) it is bypassed: a login answered by one worker must be
+    seen by the next request, whichever worker takes it.
+    """
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, store_id):
+        with self._lock:
+            entry = self._entries.get(store_id)
+            if entry is None:
+                return None
+            data, valid_until = entry
+            if valid_until < time.time():
+                del self._entries[store_id]
+                return None
+            self._entries.move_to_end(store_id)
+            return data
+
+    def set(self, store_id, data, expiry):
+        if not self.size:
+            return
+        with self._lock:
+            self._entries[store_id] = (data, min(expiry, time.time() + self.ttl))
+            self._entries.move_to_end(store_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def discard(self, store_id):
+        with self._lock:
+            self._entries.pop(store_id, None)
+
+
+class SQLiteSessionInterface(ServerSideSessionInterface):
+    """Server-side sessions stored in a SQLite table indexed by expiry.
+
+    The database file can be shared by several worker processes (WAL mode,
+    busy timeout). Expired rows are removed in batches by a sweeper thread
+    in each process and by `flask session_cleanup`.
+    """
+
+    session_class = SQLiteSession
+    ttl = False
+    sweep_batch = 500
+
+    def __init__(self, app, path, cache_size=1024, cache_ttl=5, sweep_interval=300):
+        self.path = path
+        self.cache = SessionCache(cache_size, cache_ttl)
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._sweeper_pid = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.close()
+        config = app.config
+        super().__init__(
+            app,
+            key_prefix=config.get("SESSION_KEY_PREFIX", "session:"),
+            permanent=config.get("SESSION_PERMANENT", True),
+            cleanup_n_requests=None,
+        )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def _conn(self):
+        # sqlite3 connections must stay on the thread (and process) that
+        # opened them.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def _start_sweeper(self):
+        if not self.sweep_interval or self._sweeper_pid == os.getpid():
+            return
+        self._sweeper_pid = os.getpid()
+
+        def sweep_forever():
+            while True:
+                time.sleep(self.sweep_interval)
+                try:
+                    self._delete_expired_sessions()
+                except sqlite3.Error:
+                    self.app.logger.exception("Session sweep failed")
+
+        threading.Thread(
+            target=sweep_forever, name="session-sweeper", daemon=True
+        ).start()
+
+    def open_session(self, app, request):
+        self._start_sweeper()
+        return super().open_session(app, request)
+
+    def save_session(self, app, session, response):
+        # Static files never use the session: skip refreshing its row and
+        # the Vary: Cookie that would keep shared caches from storing them.
+        if request.endpoint == "static":
+            return
+        super().save_session(app, session, response)
+
+    @property
+    def _cache(self):
+        if request.environ.get("wsgi.multiprocess"):
+            return None
+        return self.cache
+
+    def _retrieve_session_data(self, store_id):
+        cache = self._cache
+        data = cache.get(store_id) if cache else None
+        if data is None:
+            row = self._conn.execute(
+                "SELECT data, expiry FROM sessions WHERE id = ? AND expiry > ?",
+                (store_id, time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            data, expiry = row
+            if cache:
+                cache.set(store_id, data, expiry)
+        # Decoded per request so no two requests share mutable values.
+        return self.serializer.decode(data)
+
+    def _delete_session(self, store_id):
+        self.cache.discard(store_id)
+        self._conn.execute("DELETE FROM sessions WHERE id = ?", (store_id,))
+
+    def _upsert_session(self, session_lifetime, session, store_id):
+        expiry = time.time() + session_lifetime.total_seconds()
+        data = self.serializer.encode(session)
+        self._conn.execute(
+            "INSERT INTO sessions (id, data, expiry) VALUES (?, ?, ?)"
+            " ON CONFLICT (id) DO UPDATE SET data = excluded.data,"
+            " expiry = excluded.expiry",
+            (store_id, data, expiry),
+        )
+        if self._cache:
+            self._cache.set(store_id, data, expiry)
+
+    def _delete_expired_sessions(self):
+        """Delete expired sessions in small batches along the expiry index."""
+        now = time.time()
+        deleted = 0
+        while True:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE id IN ("
+                " SELECT id FROM sessions WHERE expiry <= ? LIMIT ?)",
+                (now, self.sweep_batch),
+            )
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.sweep_batch:
+                return deleted
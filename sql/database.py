@@ -4,10 +4,9 @@ conn = sqlite3.connect('../blackList.db')
 cursor = conn.cursor()
 
 
-cursor.execute("SELECT * FROM users")
-result = cursor.fetchall()
-
-for i in result:
+# Iterate the cursor instead of fetchall() so rows are printed as they are
+# read; `flask export users` streams the same data as CSV/JSONL.
+for i in cursor.execute("SELECT * FROM users"):
     print(i)
 
 conn.close()
\ No newline at end of file
@@ -0,0 +1,192 @@
+import os
+import re
+import threading
+import weakref
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select, event
+
+try:
+    import fcntl
+except ImportError:  # Windows: the lock only covers the threads of one process
+    fcntl = None
+
+# Pragmas applied to every pooled connection by the "production" profile.
+# journal_mode is stored in the database file, the rest are per connection.
+PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "foreign_keys": "ON",
+    "cache_size": -64000,  # KiB, i.e. 64 MB of page cache per connection
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+READONLY_BIND = "readonly"
+READ_METHODS = ("GET", "HEAD")
+# Statements that never take SQLite's write lock.
+READ_STATEMENT_RE = re.compile(r"\s*(SELECT|PRAGMA|EXPLAIN)\b", re.IGNORECASE)
+
+# Every engine the app creates; their pools are dropped in forked children.
+_engines = weakref.WeakSet()
+
+
+def _dispose_engines():
+    for engine in list(_engines):
+        # close=False: the parent's connections are left alone, not closed
+        # from the child, and the child opens its own on first use.
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engines)
+
+
+class WriteLock:
+    """One write transaction at a time across threads and worker processes.
+
+    SQLite lets a single connection write at a time; the others wait in
+    its busy handler, which polls with growing sleeps and gives up with
+    "database is locked" after busy_timeout. Taking this lock (a mutex for
+    the threads of a process, flock() on `path` between processes) before
+    the first write statement of a transaction queues writers instead,
+    and each one starts the moment the previous one commits. Readers, on
+    WAL, never wait for it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._setup_lock = threading.Lock()
+        self._pid = None
+        self._mutex = None
+        self._fd = None
+
+    def _open(self):
+        # A forked child gets its own descriptor: flock() locks belong to
+        # the open file, which the child would otherwise share.
+        with self._setup_lock:
+            if self._pid != os.getpid():
+                self._mutex = threading.Lock()
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._pid = os.getpid()
+
+    def held(self):
+        """Whether the current thread holds the lock."""
+        return getattr(self._local, "pid", None) == os.getpid()
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            self._open()
+        self._mutex.acquire()
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            self._mutex.release()
+            raise
+        self._local.pid = os.getpid()
+
+    def release(self):
+        if not self.held():
+            return
+        self._local.pid = None
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mutex.release()
+
+
+def serialize_writes(engine, session, lock):
+    """Hold `lock` from the first write statement on `engine` to the end
+    of the transaction.
+
+    It is released once the session has committed or rolled back, and in
+    any case when the connection goes back to the pool (e.g. a Core
+    connection used outside the session).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def take_write_lock(conn, cursor, statement, parameters, context, executemany):
+        if not lock.held() and not READ_STATEMENT_RE.match(statement):
+            lock.acquire()
+
+    @event.listens_for(engine, "checkin")
+    def release_on_checkin(dbapi_connection, connection_record):
+        lock.release()
+
+    @event.listens_for(session, "after_commit")
+    def release_after_commit(session):
+        lock.release()
+
+    @event.listens_for(session, "after_rollback")
+    def release_after_rollback(session):
+        lock.release()
+
+
+def apply_pragmas(engine, pragmas, read_only=False):
+    """Run `pragmas` on every new DBAPI connection the engine's pool opens."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            if read_only and name == "journal_mode":
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def init_sqlite_profile(app, db):
+    """Apply SQLITE_PRAGMAS to the default engine and the read-only pool.
+
+    The engines are also made fork-safe, and with SQLITE_WRITE_LOCK the
+    default engine's writers take a WriteLock next to the database file.
+    """
+    pragmas = app.config["SQLITE_PRAGMAS"]
+    with app.app_context():
+        for key, engine in db.engines.items():
+            _engines.add(engine)
+            if engine.dialect.name == "sqlite":
+                apply_pragmas(engine, pragmas, read_only=key == READONLY_BIND)
+        path = database_file(db.engine)
+        if app.config["SQLITE_WRITE_LOCK"] and path is not None:
+            serialize_writes(db.engine, db.session, WriteLock(f"{path}-writer.lock"))
+
+
+def database_file(engine):
+    """The path of `engine`'s SQLite database file, None if it has none."""
+    if engine.dialect.name != "sqlite":
+        return None
+    database = engine.url.database
+    if not database or database == ":memory:" or database.startswith("file:"):
+        return None
+    return os.path.abspath(database)
+
+
+class RoutingSession(Session):
+    """Send the SELECTs of GET/HEAD requests to the read-only pool.
+
+    Flushes, UPDATE/DELETE statements and everything after the first write
+    in a request keep going to the writable engine, so a request always
+    reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_readonly(clause):
+            return self._db.engines[READONLY_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_readonly(self, clause):
+        return (
+            isinstance(clause, Select)
+            and READONLY_BIND in self._db.engines
+            and has_request_context()
+            and request.method in READ_METHODS
+            and not self._flushing
+            and not (self.new or self.dirty or self.deleted)
+            and not self.info.get("data_changed")
+        )
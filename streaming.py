@@ -0,0 +1,178 @@
+import zlib
+
+from flask import current_app, get_flashed_messages, render_template, stream_template
+from flask_wtf import FlaskForm
+from flask_wtf.csrf import generate_csrf
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header, parse_options_header
+
+from query_guard import check_after_stream
+
+STREAM_CHUNK_SIZE = 8192
+
+
+def stream_page(template_name, **context):
+    """stream_template() in chunks of about STREAM_CHUNK_SIZE characters.
+
+    The session is saved before the body is sent, so everything the
+    template would store in it (popped flashes, a new CSRF token) is done
+    up front. Jinja yields every text node and expression on its own;
+    joining them keeps the WSGI server and the compressor from handling
+    thousands of tiny writes. The query guard counts the statements the
+    template runs once the last chunk is out. With STREAM_TEMPLATES off the page is
+    rendered in full, as render_template() does.
+    """
+    if not current_app.config["STREAM_TEMPLATES"]:
+        return render_template(template_name, **context)
+    get_flashed_messages()
+    if any(
+        isinstance(value, FlaskForm) and value.meta.csrf for value in context.values()
+    ):
+        generate_csrf()
+    return _rechunk(
+        check_after_stream(stream_template(template_name, **context)),
+        STREAM_CHUNK_SIZE,
+    )
+
+
+def _rechunk(chunks, size):
+    buffer = []
+    length = 0
+    try:
+        for chunk in chunks:
+            buffer.append(chunk)
+            length += len(chunk)
+            if length >= size:
+                yield "".join(buffer)
+                buffer = []
+                length = 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        chunks.close()
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        # A sync flush per chunk sends what the app has produced right away.
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _brotli_available():
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class CompressionMiddleware:
+    """Compress HTML and JSON responses as they are streamed out.
+
+    Each chunk the application yields is compressed and flushed at once,
+    so streamed pages keep their time to first byte. Brotli is preferred
+    when the client accepts it and the brotli package is installed, gzip
+    otherwise. Responses that are small (by Content-Length), partial,
+    already encoded (exports, precompressed assets) or of another type
+    (uploaded photos) pass through untouched, as do HEAD requests.
+    """
+
+    def __init__(
+        self,
+        app,
+        mimetypes=("text/html", "application/json"),
+        min_size=1024,
+        level=6,
+        brotli_quality=4,
+    ):
+        self.app = app
+        self.mimetypes = frozenset(mimetypes)
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.brotli = _brotli_available()
+
+    def _encoding(self, environ):
+        accepted = parse_accept_header(environ.get("HTTP_ACCEPT_ENCODING"))
+        if self.brotli and accepted["br"] > 0:
+            return "br"
+        if accepted["gzip"] > 0:
+            return "gzip"
+        return None
+
+    def _compressible(self, status, headers):
+        if int(status.split(None, 1)[0]) in (204, 206, 304):
+            return False
+        mimetype, _ = parse_options_header(headers.get("Content-Type", ""))
+        if mimetype not in self.mimetypes or "Content-Encoding" in headers:
+            return False
+        if "no-transform" in headers.get("Cache-Control", ""):
+            return False
+        length = headers.get("Content-Length")
+        return length is None or int(length) >= self.min_size
+
+    def __call__(self, environ, start_response):
+        if environ["REQUEST_METHOD"] == "HEAD":
+            return self.app(environ, start_response)
+        encoding = self._encoding(environ)
+        compressor = None
+
+        def compressing_start_response(status, header_list, exc_info=None):
+            nonlocal compressor
+            headers = Headers(header_list)
+            if self._compressible(status, headers):
+                vary = headers.get("Vary")
+                if not vary:
+                    headers["Vary"] = "Accept-Encoding"
+                elif "accept-encoding" not in vary.lower():
+                    headers["Vary"] = f"{vary}, Accept-Encoding"
+                if encoding is not None:
+                    compressor = (
+                        _Brotli(self.brotli_quality)
+                        if encoding == "br"
+                        else _Gzip(self.level)
+                    )
+                    headers["Content-Encoding"] = encoding
+                    headers.pop("Content-Length", None)
+                    # The encoded bytes differ from what the ETag was computed on.
+                    etag = headers.get("ETag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = f"W/{etag}"
+            return start_response(status, headers.to_wsgi_list(), exc_info)
+
+        body = self.app(environ, compressing_start_response)
+        if compressor is None:
+            return body
+        return self._compress(body, compressor)
+
+    def _compress(self, body, compressor):
+        try:
+            for chunk in body:
+                if chunk:
+                    yield compressor.compress(chunk)
+            yield compressor.finish()
+        finally:
+            close = getattr(body, "close", None)
+            if close is not None:
+                close()
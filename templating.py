@@ -0,0 +1,53 @@
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_templates(app):
+    """Give the app's Jinja environment a bytecode cache on disk.
+
+    Must run before anything touches `app.jinja_env`. Compiled templates
+    are written to TEMPLATE_CACHE_FOLDER (default: jinja_cache in the
+    instance folder), which every worker process reads, so a template is
+    compiled from source once per deploy rather than once per process.
+    Entries are keyed on the template's path and checked against a hash
+    of its source, so an edited template is never served stale.
+    """
+    folder = app.config["TEMPLATE_CACHE_FOLDER"]
+    if folder is None:
+        folder = os.path.join(app.instance_path, "jinja_cache")
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+        app.jinja_options = {
+            **app.jinja_options,
+            "bytecode_cache": FileSystemBytecodeCache(folder),
+        }
+    app.cli.add_command(compile_templates_command)
+
+
+@click.command("compile-templates")
+@click.option("--clear", is_flag=True, help="Empty the bytecode cache first")
+@with_appcontext
+def compile_templates_command(clear):
+    """Compile every template into the bytecode cache.
+
+    Run at build time, after the templates are in place, so that the
+    first requests of every worker skip the Jinja compiler.
+    """
+    env = current_app.jinja_env
+    if env.bytecode_cache is None:
+        raise click.ClickException("TEMPLATE_CACHE_FOLDER is turned off")
+    if clear:
+        env.bytecode_cache.clear()
+    started = time.perf_counter()
+    names = env.list_templates()
+    for name in names:
+        env.get_template(name)
+    click.echo(
+        f"Compiled {len(names)} templates in"
+        f" {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
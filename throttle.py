@@ -0,0 +1,69 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class SlidingWindowLimiter:
+    """At most `limit` hits per key in any `window` seconds.
+
+    Uses the sliding window counter approximation: each key keeps only
+    the hit counts of the current and the previous fixed window, and the
+    previous one is weighted by how much of it still overlaps the sliding
+    window. Checks and hits are O(1) and a key costs a few words. The
+    least recently hit keys are dropped beyond `max_keys`, so a flood of
+    distinct keys cannot grow memory without bound.
+    """
+
+    def __init__(self, limit, window, max_keys=100_000, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._counts = OrderedDict()  # key -> [window_start, previous, current]
+        self._lock = threading.Lock()
+
+    def _entry(self, key, now):
+        start = now - now % self.window
+        entry = self._counts.get(key)
+        if entry is None:
+            return [start, 0, 0]
+        if entry[0] != start:
+            previous = entry[2] if start - entry[0] == self.window else 0
+            entry = [start, previous, 0]
+        return entry
+
+    def _estimate(self, entry, now):
+        overlap = 1 - (now - entry[0]) / self.window
+        return entry[1] * overlap + entry[2]
+
+    def retry_after(self, key):
+        """Seconds until `key` may hit again; 0 when it is not limited."""
+        now = self.clock()
+        with self._lock:
+            entry = self._entry(key, now)
+            if self._estimate(entry, now) < self.limit:
+                return 0
+            if entry[2] >= self.limit:
+                # Limited until the current window has become the previous
+                # one and slid far enough out.
+                wait = entry[0] + self.window - now
+                wait += self.window * (1 - self.limit / entry[2])
+                return math.ceil(wait)
+            # Limited until enough of the previous window has slid out.
+            overlap = (self.limit - entry[2]) / entry[1]
+            return max(1, math.ceil(entry[0] + self.window * (1 - overlap) - now))
+
+    def hit(self, key):
+        now = self.clock()
+        with self._lock:
+            entry = self._entry(key, now)
+            entry[2] += 1
+            self._counts[key] = entry
+            self._counts.move_to_end(key)
+            if len(self._counts) > self.max_keys:
+                self._counts.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
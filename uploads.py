@@ -0,0 +1,85 @@
+import hashlib
+import os
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+EXTENSION_ALIASES = {"jpeg": "jpg"}
+
+
+def _extension(filename):
+    ext = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    return EXTENSION_ALIASES.get(ext, ext)
+
+
+def content_path(digest, ext):
+    """Sharded location of a stored file, e.g. ab/cd/abcd...ef.jpg."""
+    name = f"{digest}.{ext}" if ext else digest
+    return "/".join([digest[:2], digest[2:4], name])
+
+
+def _place(upload_folder, temp_path, digest, ext):
+    relative = content_path(digest, ext)
+    target = os.path.join(upload_folder, relative)
+    if os.path.exists(target):
+        # Identical bytes are already stored: keep the existing copy, and
+        # touch it so the photo collector's grace period covers the new post.
+        os.remove(temp_path)
+        os.utime(target)
+        return relative, False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(temp_path, target)
+    return relative, True
+
+
+def store_upload(upload_folder, file_storage):
+    """Save an uploaded file under its SHA-256, hashing it as it is copied.
+
+    Returns `(relative_path, created)`; `created` is False when the same
+    content was already in the store and the upload was deduplicated.
+    """
+    os.makedirs(upload_folder, exist_ok=True)
+    digest = hashlib.sha256()
+    temp = tempfile.NamedTemporaryFile(dir=upload_folder, delete=False)
+    try:
+        with temp:
+            for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                temp.write(chunk)
+        return _place(
+            upload_folder,
+            temp.name,
+            digest.hexdigest(),
+            _extension(file_storage.filename),
+        )
+    except BaseException:
+        # Nothing else would remove it: the collector only looks at photos.
+        try:
+            os.remove(temp.name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def store_existing(upload_folder, filename):
+    """Move a file already in `upload_folder` into the content-addressed layout."""
+    source = os.path.join(upload_folder, filename)
+    digest = hashlib.sha256()
+    with open(source, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return _place(upload_folder, source, digest.hexdigest(), _extension(filename))
+
+
+def is_content_path(filename):
+    return filename.count("/") == 2
+
+
+def remove_stored(upload_folder, *relative_paths):
+    """Delete stored files, ignoring ones that are already gone."""
+    for relative in relative_paths:
+        if not relative:
+            continue
+        try:
+            os.remove(os.path.join(upload_folder, relative))
+        except FileNotFoundError:
+            pass